@@ -8,6 +8,12 @@ from .ai.routes import ai_bp
 from .audio.routes import audio_bp
 from .admin.routes import admin_bp
 from .users.routes import user_bp
+from .transactions.ledger import totals_cli
+from .admin.rollups import rollups_cli
+from .activity import activity_cli
+from .percentiles import percentiles_cli
+from .realtime import events  # noqa: F401 (registers Socket.IO handlers)
+from .realtime.queue import socketio_options
 from flask_cors import CORS
 from sqlalchemy import inspect
 import os
@@ -23,7 +29,7 @@ def create_app():
     CORS(app, supports_credentials=True, origins=["http://localhost:5173","https://finlogix-three.vercel.app"])
     db.init_app(app)
     migrate.init_app(app, db)
-    socketio.init_app(app)
+    socketio.init_app(app, **socketio_options(app.config))
     jwt.init_app(app)
     mimetypes.add_type('audio/webm', '.webm')
 
@@ -33,6 +39,10 @@ def create_app():
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(user_bp,url_prefix='/user')
     app.register_blueprint(audio_bp,url_prefix='/audio')
+    app.cli.add_command(totals_cli)
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(activity_cli)
+    app.cli.add_command(percentiles_cli)
     @app.route('/static/uploads/<filename>')
     def serve_audio(filename):
         return send_from_directory('static/uploads', filename, mimetype='audio/webm')
@@ -0,0 +1,131 @@
+"""Active-user counts from per-day HyperLogLog sketches.
+
+Every transaction insert adds its user to the sketch of the transaction's
+day (see transactions/ledger.py), so "active users over a window" merges
+at most a few dozen 4 KiB blobs instead of running a DISTINCT over the
+transaction table. Counts carry the sketch's ~1.6% standard error.
+
+A user not yet in the day's sketch is appended as a small delta row
+rather than written into the shared per-day row, so concurrent writers
+never wait on each other's locks. A background task folds the deltas into
+daily_activity_sketch shortly after they commit, and reads merge both
+tables.
+
+Sketches only grow: a user whose transactions on a day are all deleted
+still counts as active that day until ``flask activity rebuild`` runs.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, insert, null
+from .aggregates import Compactor, locked_row
+from .extensions import db
+from .models import ActivityDelta, DailyActivitySketch, DailyStat, Transaction
+from .sketches import HyperLogLog
+
+COMPACT_BATCH_SIZE = 1000
+COMPACT_INTERVAL = 5.0  # seconds between background compactions per process
+
+
+def record(day, user_ids):
+    """Append deltas for the ``user_ids`` not yet in ``day``'s sketch to the current DB transaction."""
+    row = db.session.get(DailyActivitySketch, day)
+    # Registers only ever grow, so an unlocked read rules out most writes
+    sketch = HyperLogLog(row.registers if row is not None else None)
+    new = [{"day": day, "user_id": user_id} for user_id in sorted(user_ids) if not sketch.covers(user_id)]
+    if new:
+        db.session.execute(insert(ActivityDelta), new)
+        compactor.schedule()
+
+
+def compact(batch_size=COMPACT_BATCH_SIZE):
+    """Fold up to ``batch_size`` pending deltas into daily_activity_sketch and commit.
+
+    Returns how many deltas were folded. Deltas claimed by a concurrent
+    compaction are skipped; adding a user twice is harmless anyway.
+    """
+    deltas = ActivityDelta.query.order_by(ActivityDelta.id) \
+        .limit(batch_size) \
+        .with_for_update(skip_locked=True) \
+        .all()
+    if not deltas:
+        db.session.commit()
+        return 0
+
+    users = defaultdict(set)
+    for delta in deltas:
+        users[delta.day].add(delta.user_id)
+    # Sorted so concurrent compactions lock rows in the same order
+    for day, user_ids in sorted(users.items()):
+        row = locked_row(DailyActivitySketch, {"day": day}, registers=bytes(HyperLogLog.M))
+        sketch = HyperLogLog(row.registers)
+        for user_id in user_ids:
+            sketch.add(user_id)
+        row.registers = sketch.to_bytes()
+
+    ActivityDelta.query.filter(ActivityDelta.id.in_([d.id for d in deltas])) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return len(deltas)
+
+
+compactor = Compactor(compact, COMPACT_BATCH_SIZE, COMPACT_INTERVAL, "Activity")
+
+
+def active_users(start, end):
+    """Approximate distinct users with a transaction between ``start`` and ``end`` (inclusive dates)."""
+    sketches = db.session.query(DailyActivitySketch.registers, null().label("user_id")) \
+        .filter(DailyActivitySketch.day >= start, DailyActivitySketch.day <= end)
+    deltas = db.session.query(null().label("registers"), ActivityDelta.user_id) \
+        .filter(ActivityDelta.day >= start, ActivityDelta.day <= end)
+
+    # Compacted sketches plus the users not folded in yet, in one statement
+    sketch = HyperLogLog()
+    for registers, user_id in sketches.union_all(deltas):
+        if registers is not None:
+            sketch.merge(HyperLogLog(registers))
+        else:
+            sketch.add(user_id)
+    return sketch.count()
+
+
+activity_cli = AppGroup('activity', help="Maintain the per-day active-user sketches.")
+
+
+@activity_cli.command('compact')
+def compact_command():
+    """Fold every pending activity delta into daily_activity_sketch."""
+    folded = batch = compact()
+    while batch == COMPACT_BATCH_SIZE:
+        batch = compact()
+        folded += batch
+    click.echo(f"✅ Folded {folded} activity deltas.")
+
+
+@activity_cli.command('rebuild')
+@click.option('--since', type=click.DateTime(formats=["%Y-%m-%d"]), help="First day to rebuild (default: earliest transaction).")
+def rebuild(since):
+    """Rebuild daily_activity_sketch from the daily_stats rollup, one day per DB transaction."""
+    first_ts = db.session.query(func.min(Transaction.timestamp)).scalar()
+    if first_ts is None:
+        click.echo("No transactions to sketch.")
+        return
+
+    day = since.date() if since else first_ts.date()
+    days = 0
+    while day <= date.today():
+        sketch = HyperLogLog()
+        users = db.session.query(DailyStat.user_id).filter(DailyStat.day == day, DailyStat.count > 0).distinct()
+        for (user_id,) in users:
+            sketch.add(user_id)
+
+        db.session.query(DailyActivitySketch).filter(DailyActivitySketch.day == day).delete()
+        db.session.query(ActivityDelta).filter(ActivityDelta.day == day).delete()
+        if any(sketch.registers):
+            db.session.add(DailyActivitySketch(day=day, registers=sketch.to_bytes()))
+            days += 1
+        db.session.commit()
+        day += timedelta(days=1)
+
+    click.echo(f"✅ Rebuilt {days} daily activity sketches.")
@@ -0,0 +1,121 @@
+"""Admin reports, each answered by one joined aggregate query.
+
+The reports read the rollup tables rather than scanning the transaction
+table, and join users/categories in the same statement so no per-row
+lookups are needed. Lifetime reports use user_category_totals; reports
+over a date window use daily_stats.
+"""
+from datetime import date
+from sqlalchemy import func
+from ..extensions import db
+from ..models import User, Category, DailyStat, UserCategoryTotal
+
+DEFAULT_PER_PAGE = 100
+MAX_PER_PAGE = 1000
+STREAM_BATCH_SIZE = 1000
+
+
+def _iso_date(value):
+    if not isinstance(value, str):
+        raise ValueError(f"expected an ISO date string, got {value!r}")
+    return date.fromisoformat(value)
+
+
+def window_args(args):
+    """Parse optional ?start / ?end ISO dates; raises ValueError on bad input."""
+    start = _iso_date(args["start"]) if args.get("start") else None
+    end = _iso_date(args["end"]) if args.get("end") else None
+    return start, end
+
+
+def page_args(args, default_per_page=DEFAULT_PER_PAGE):
+    """Parse ?page / ?per_page (1-based); raises ValueError on bad input."""
+    page = int(args.get("page", 1))
+    per_page = min(int(args.get("per_page", default_per_page)), MAX_PER_PAGE)
+    if page < 1 or per_page < 1:
+        raise ValueError("page and per_page must be positive")
+    return page, per_page
+
+
+def _source(start, end):
+    """Rollup table and filters for a report over [start, end] (inclusive dates, either optional)."""
+    if start is None and end is None:
+        return UserCategoryTotal, []
+    filters = []
+    if start is not None:
+        filters.append(DailyStat.day >= start)
+    if end is not None:
+        filters.append(DailyStat.day <= end)
+    return DailyStat, filters
+
+
+def _sorted_page(query, sort_columns, tiebreak, sort, order, page, per_page, stream=False):
+    """Order ``query`` and return one page of rows, or with ``stream`` every row from a single server-side cursor."""
+    if sort not in sort_columns:
+        raise ValueError(f"sort must be one of {', '.join(sort_columns)}")
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+    column = sort_columns[sort]
+    # The unique tiebreak keeps pages stable when sort values repeat
+    query = query.order_by(column.desc() if order == "desc" else column.asc(), tiebreak)
+    if stream:
+        return query.yield_per(STREAM_BATCH_SIZE)
+    if per_page is not None:
+        query = query.limit(per_page).offset((page - 1) * per_page)
+    return query.all()
+
+
+def user_spend(min_total=None, start=None, end=None, sort="total_spent", order="desc", page=1, per_page=DEFAULT_PER_PAGE,
+               stream=False):
+    """Expense total per user, optionally only users above ``min_total``.
+
+    With ``stream`` the whole report is yielded from one query instead of returning a page.
+    """
+    src, filters = _source(start, end)
+    total_spent = func.sum(src.total).label("total_spent")
+    query = db.session.query(User.id, User.email, total_spent) \
+        .join(src, src.user_id == User.id) \
+        .filter(src.type == "expense", *filters) \
+        .group_by(User.id, User.email) \
+        .having(func.sum(src.count) > 0)
+    if min_total is not None:
+        query = query.having(func.sum(src.total) > min_total)
+
+    rows = _sorted_page(query, {"total_spent": total_spent, "email": User.email, "user_id": User.id},
+                        User.id, sort, order, page, per_page, stream)
+    records = ({"user_id": user_id, "email": email, "total_spent": total} for user_id, email, total in rows)
+    return records if stream else list(records)
+
+
+def category_stats(start=None, end=None, sort="transactions", order="desc", page=1, per_page=None, stream=False):
+    """Transaction count and amount per category, across all users and types."""
+    src, filters = _source(start, end)
+    count = func.sum(src.count).label("transactions")
+    total = func.sum(src.total).label("total_spent")
+    query = db.session.query(Category.name, count, total) \
+        .join(src, src.category_id == Category.id) \
+        .filter(*filters) \
+        .group_by(Category.id, Category.name) \
+        .having(func.sum(src.count) > 0)
+
+    rows = _sorted_page(query, {"transactions": count, "total_spent": total, "category": Category.name},
+                        Category.id, sort, order, page, per_page, stream)
+    records = ({"category": name, "transactions": int(txns), "total_spent": spent} for name, txns, spent in rows)
+    return records if stream else list(records)
+
+
+def type_breakdown(start=None, end=None, sort="category", order="asc", page=1, per_page=None, stream=False):
+    """Income and expense totals per category, pivoted into one row per category."""
+    src, filters = _source(start, end)
+    income = func.sum(db.case((src.type == "income", src.total), else_=0)).label("income")
+    expense = func.sum(db.case((src.type == "expense", src.total), else_=0)).label("expense")
+    query = db.session.query(Category.name, income, expense) \
+        .join(src, src.category_id == Category.id) \
+        .filter(*filters) \
+        .group_by(Category.id, Category.name) \
+        .having(func.sum(src.count) > 0)
+
+    rows = _sorted_page(query, {"category": Category.name, "income": income, "expense": expense},
+                        Category.id, sort, order, page, per_page, stream)
+    records = ({"category": name, "income": float(inc), "expense": float(exp)} for name, inc, exp in rows)
+    return records if stream else list(records)
@@ -0,0 +1,61 @@
+"""Keyset-paginated user lookups for the admin user and admin lists.
+
+Emails are stored normalized (register and login strip and lower-case
+them), so a case-insensitive prefix search is a plain range scan on the
+email index, or on (role, email) when a role filter is given. Pages are
+ordered by the unique email, which doubles as the cursor.
+"""
+import base64
+from ..extensions import db
+from ..models import User
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+COUNT_CAP = 1000  # the total is exact below this, "at least COUNT_CAP" above
+ROLES = ("user", "admin")
+
+
+def encode_cursor(email):
+    return base64.urlsafe_b64encode(email.encode()).decode()
+
+
+def decode_cursor(cursor):
+    return base64.urlsafe_b64decode(cursor.encode()).decode()
+
+
+def search(prefix=None, role=None, cursor=None, limit=DEFAULT_LIMIT):
+    """One page of users whose email starts with ``prefix``.
+
+    Returns ``{"users", "next_cursor", "total", "total_capped"}``; raises
+    ValueError on bad input so routes can answer with a 400.
+    """
+    if role is not None and role not in ROLES:
+        raise ValueError(f"role must be one of {', '.join(ROLES)}")
+    limit = min(int(limit), MAX_LIMIT)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    query = db.session.query(User.id, User.email, User.role)
+    if role is not None:
+        query = query.filter(User.role == role)
+    if prefix:
+        query = query.filter(User.email.startswith(prefix.strip().lower(), autoescape=True))
+
+    # Count at most COUNT_CAP matches instead of the whole filtered table
+    capped = query.with_entities(User.id).limit(COUNT_CAP).subquery()
+    total = db.session.query(db.func.count()).select_from(capped).scalar()
+
+    if cursor:
+        query = query.filter(User.email > decode_cursor(cursor))
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(User.email).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "users": [{"id": r.id, "email": r.email, "role": r.role} for r in rows],
+        "next_cursor": encode_cursor(rows[-1].email) if has_more else None,
+        "total": total,
+        "total_capped": total >= COUNT_CAP
+    }
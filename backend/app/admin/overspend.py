@@ -0,0 +1,89 @@
+"""Rolling-window overspend detection over the daily_stats rollup.
+
+A user is flagged when their expense total over the last ``window`` days
+exceeds ``limit``, or when any category they spent in exceeds its own
+threshold in ``category_limits``. The query yields one row per
+(user, category) ordered by user, so results stream a user at a time.
+
+Incremental runs pass back the cursor returned by the previous run and
+only re-evaluate users who wrote transactions since then. Each write
+stages an outbox event (realtime/outbox.py) and the newest events per
+user are never trimmed, so outbox ids make a cheap change log. A user
+who stops writing can still drop out of a window as days pass, so a full
+run is still needed once per day to catch those.
+"""
+from datetime import date, timedelta
+from itertools import groupby
+from sqlalchemy import func
+from ..extensions import db
+from ..models import DailyStat, OutboxEvent, User
+from ..categories import categories
+
+WINDOWS = (7, 30, 90)
+STREAM_BATCH_SIZE = 1000
+
+
+def parse_category_limits(values):
+    """Parse repeated ``<category_id>:<amount>`` args; raises ValueError on bad input."""
+    limits = {}
+    for value in values:
+        category_id, _, amount = value.partition(":")
+        limits[int(category_id)] = float(amount)
+    return limits
+
+
+def cursor():
+    """Change-log position to pass as ``since`` on the next incremental run."""
+    return db.session.query(func.max(OutboxEvent.id)).scalar() or 0
+
+
+def evaluate(window, limit=None, category_limits=None, since=None, as_of=None):
+    """Yield one dict per flagged user, in user id order.
+
+    ``since`` restricts the run to users with outbox events after that
+    cursor. Raises ValueError for an unsupported window or when neither
+    ``limit`` nor ``category_limits`` is given.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"window must be one of {', '.join(map(str, WINDOWS))}")
+    category_limits = category_limits or {}
+    if limit is None and not category_limits:
+        raise ValueError("limit or category_limit is required")
+
+    as_of = as_of or date.today()
+    spent = func.sum(DailyStat.total).label("spent")
+    query = db.session.query(DailyStat.user_id, User.email, DailyStat.category_id, spent) \
+        .join(User, User.id == DailyStat.user_id) \
+        .filter(DailyStat.type == "expense",
+                DailyStat.day > as_of - timedelta(days=window),
+                DailyStat.day <= as_of) \
+        .group_by(DailyStat.user_id, User.email, DailyStat.category_id) \
+        .having(func.sum(DailyStat.count) > 0) \
+        .order_by(DailyStat.user_id)
+    if since is not None:
+        changed = db.session.query(OutboxEvent.user_id).filter(OutboxEvent.id > since).distinct()
+        query = query.filter(DailyStat.user_id.in_(changed))
+
+    return _flagged(query.yield_per(STREAM_BATCH_SIZE), window, limit, category_limits)
+
+
+def _flagged(rows, window, limit, category_limits):
+    for (user_id, email), group in groupby(rows, key=lambda r: (r.user_id, r.email)):
+        group = list(group)
+        total = sum(r.spent for r in group)
+        over = [{
+            "category_id": r.category_id,
+            "category": categories.name(r.category_id),
+            "spent": r.spent,
+            "limit": category_limits[r.category_id]
+        } for r in group if r.category_id in category_limits and r.spent > category_limits[r.category_id]]
+
+        if over or (limit is not None and total > limit):
+            yield {
+                "user_id": user_id,
+                "email": email,
+                "window": window,
+                "total_spent": total,
+                "over_limit": limit is not None and total > limit,
+                "categories": over
+            }
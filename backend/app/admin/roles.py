@@ -0,0 +1,51 @@
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+
+class RoleCache:
+    """Role changes that access tokens issued before them don't reflect yet.
+
+    Admin checks trust the ``role`` claim in the access token; ``set`` records
+    a promotion or demotion so it overrides that claim until every token
+    minted before the change has expired. Refreshed tokens read the role from
+    the database, so nothing needs to outlive JWT_ACCESS_TOKEN_EXPIRES.
+    """
+
+    def __init__(self):
+        self._overrides = {}  # user_id -> (role, changed_at, expires_at)
+        self._lock = threading.Lock()
+
+    def set(self, user_id, role):
+        now = time.time()
+        ttl = current_app.config["JWT_ACCESS_TOKEN_EXPIRES"].total_seconds()
+        with self._lock:
+            self._overrides[int(user_id)] = (role, now, now + ttl)
+
+    def role(self, user_id, claims):
+        """Effective role for ``user_id`` given its decoded access token ``claims``."""
+        entry = self._overrides.get(int(user_id))
+        if entry is not None:
+            role, changed_at, expires_at = entry
+            if expires_at < time.time():
+                with self._lock:
+                    if self._overrides.get(int(user_id)) is entry:
+                        del self._overrides[int(user_id)]
+            elif claims.get("iat", 0) <= changed_at:
+                return role
+        return claims.get("role")
+
+
+roles = RoleCache()
+
+
+def admin_only(view):
+    """Reject non-admins with 403; must sit below ``@jwt_required``."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if roles.role(get_jwt_identity(), get_jwt()) != "admin":
+            return jsonify({"message": "Admins only"}), 403
+        return view(*args, **kwargs)
+    return wrapper
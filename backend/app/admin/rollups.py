@@ -0,0 +1,76 @@
+"""Backfill and read helpers for the daily_stats rollup.
+
+Transaction writes keep daily_stats current (see transactions/ledger.py);
+``flask rollups backfill`` rebuilds it from history so an existing
+database can adopt it.
+"""
+from datetime import date, datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, insert
+from ..extensions import db
+from ..models import DailyStat, Transaction
+from ..transactions.ledger import UNCATEGORIZED
+from .trends import bucket_expr
+
+
+def category_summary():
+    """Total expense, transaction count and most used category, from the rollup."""
+    total_spent, total_txns = db.session.query(
+        func.sum(db.case((DailyStat.type == "expense", DailyStat.total), else_=0)),
+        func.sum(DailyStat.count)
+    ).one()
+
+    usage = func.sum(DailyStat.count)
+    top = db.session.query(DailyStat.category_id) \
+        .filter(DailyStat.category_id != UNCATEGORIZED) \
+        .group_by(DailyStat.category_id) \
+        .having(usage > 0) \
+        .order_by(usage.desc(), DailyStat.category_id) \
+        .first()
+
+    return float(total_spent or 0), int(total_txns or 0), top.category_id if top else None
+
+
+rollups_cli = AppGroup('rollups', help="Maintain the daily_stats rollup table.")
+
+
+@rollups_cli.command('backfill')
+@click.option('--since', type=click.DateTime(formats=["%Y-%m-%d"]), help="First day to rebuild (default: earliest transaction).")
+@click.option('--chunk-days', default=30, show_default=True, help="Days rebuilt per DB transaction.")
+def backfill(since, chunk_days):
+    """Rebuild daily_stats from the transaction table, one chunk of days at a time."""
+    first_ts, last_ts = db.session.query(func.min(Transaction.timestamp), func.max(Transaction.timestamp)).one()
+    if first_ts is None:
+        click.echo("No transactions to roll up.")
+        return
+
+    day = since.date() if since else first_ts.date()
+    last = max(last_ts.date(), date.today())
+    rows = 0
+    while day <= last:
+        chunk_end = min(day + timedelta(days=chunk_days), last + timedelta(days=1))
+        # Replace the chunk atomically so live increments and the rebuild don't double count
+        db.session.query(DailyStat).filter(DailyStat.day >= day, DailyStat.day < chunk_end) \
+            .delete(synchronize_session=False)
+        bucket = bucket_expr(Transaction.timestamp, "day")
+        result = db.session.execute(insert(DailyStat).from_select(
+            ["day", "user_id", "category_id", "type", "total", "count"],
+            db.session.query(
+                bucket,
+                Transaction.user_id,
+                func.coalesce(Transaction.category_id, UNCATEGORIZED),
+                Transaction.type,
+                func.sum(Transaction.amount),
+                func.count()
+            ).filter(
+                Transaction.timestamp >= datetime.combine(day, datetime.min.time()),
+                Transaction.timestamp < datetime.combine(chunk_end, datetime.min.time())
+            ).group_by(bucket, Transaction.user_id, Transaction.category_id, Transaction.type)
+        ))
+        db.session.commit()
+        rows += max(result.rowcount, 0)
+        click.echo(f"  {day.isoformat()} → {(chunk_end - timedelta(days=1)).isoformat()}: {result.rowcount} rows")
+        day = chunk_end
+
+    click.echo(f"✅ Backfilled {rows} daily_stats rows.")
@@ -1,87 +1,139 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context
 from ..models import User, Transaction, Category
 from ..extensions import db
+from ..categories import categories
+from ..cache import response_cache
+from .. import activity, percentiles
+from ..jobs import jobs
+from . import analytics, directory, overspend, reports, rollups, trends
+from .roles import admin_only, roles
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
-from datetime import timedelta,date
+from datetime import datetime, timedelta, date
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
-# 🧠 Helper: Check if user is admin
-def admin_required():
-    user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))
-    return user and user.role == "admin"
-
-
 # 📊 All users and their total spend
 @admin_bp.route('/user-summaries', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def user_summaries():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    summaries = db.session.query(
-        Transaction.user_id,
-        func.sum(Transaction.amount).label('total_spent')
-    ).filter(Transaction.type == 'expense') \
-     .group_by(Transaction.user_id).all()
-
-    result = []
-    for user_id, total in summaries:
-        user = User.query.get(user_id)
-        if user:
-            result.append({
-                "user_id": user.id,
-                "email": user.email,
-                "total_spent": total
-            })
-
-    return jsonify(result)
+    try:
+        page, per_page = analytics.page_args(request.args)
+        start, end = analytics.window_args(request.args)
+        return response_cache.respond(lambda: analytics.user_spend(
+            start=start,
+            end=end,
+            sort=request.args.get("sort", "total_spent"),
+            order=request.args.get("order", "desc"),
+            page=page,
+            per_page=per_page
+        ))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
 
 # 🚩 Flag top overspenders
 @admin_bp.route('/overspenders', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def overspenders():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    limit = float(request.args.get("limit", 10000))
-    overspenders = db.session.query(
-        Transaction.user_id,
-        func.sum(Transaction.amount).label('total_spent')
-    ).filter(Transaction.type == 'expense') \
-     .group_by(Transaction.user_id).having(func.sum(Transaction.amount) > limit).all()
-
-    result = []
-    for user_id, total in overspenders:
-        user = User.query.get(user_id)
-        if user:
-            result.append({
-                "user_id": user.id,
-                "email": user.email,
-                "total_spent": total
-            })
-
-    return jsonify(result)
+    try:
+        limit = float(request.args.get("limit", 10000))
+        page, per_page = analytics.page_args(request.args)
+        start, end = analytics.window_args(request.args)
+        return response_cache.respond(lambda: analytics.user_spend(
+            min_total=limit,
+            start=start,
+            end=end,
+            sort=request.args.get("sort", "total_spent"),
+            order=request.args.get("order", "desc"),
+            page=page,
+            per_page=per_page
+        ))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+
+# 🚨 Rolling-window overspend detection (?format=ndjson streams the results)
+@admin_bp.route('/overspend', methods=['GET'])
+@jwt_required(locations=["headers"])
+@admin_only
+def overspend_report():
+    try:
+        window = int(request.args.get("window", 30))
+        limit = float(request.args["limit"]) if request.args.get("limit") else None
+        category_limits = overspend.parse_category_limits(request.args.getlist("category_limit"))
+        since = int(request.args["since"]) if request.args.get("since") else None
+        cursor = overspend.cursor()
+        flagged = overspend.evaluate(window, limit, category_limits, since)
+    except ValueError as e:
+        return jsonify({"message": f"Invalid query parameters: {e}"}), 400
+
+    if request.args.get("format") == "ndjson":
+        lines = (json.dumps(row) + "\n" for row in flagged)
+        return Response(stream_with_context(lines), mimetype="application/x-ndjson",
+                        headers={"X-Overspend-Cursor": str(cursor)})
+
+    return jsonify({"window": window, "cursor": cursor, "flagged": list(flagged)}), 200
+
+
+# 📦 Queue a full-history report; clients get a 'report_ready' socket event when it is done
+@admin_bp.route('/reports', methods=['POST'])
+@jwt_required(locations=["headers"])
+@admin_only
+def create_report():
+    params = request.get_json(silent=True) or {}
+    try:
+        reports.validate(params)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    job = jobs.submit("report", get_jwt_identity(), params, reports.run, "report_ready")
+    return jsonify(job), 202
+
+
+@admin_bp.route('/reports/<job_id>', methods=['GET'])
+@jwt_required(locations=["headers"])
+@admin_only
+def report_status(job_id):
+    job = jobs.store.get(job_id)
+    if not job or job["kind"] != "report":
+        return jsonify({"message": "Report not found"}), 404
+    return jsonify(job), 200
+
+
+@admin_bp.route('/reports/<job_id>/download', methods=['GET'])
+@jwt_required(locations=["headers"])
+@admin_only
+def download_report(job_id):
+    job = jobs.store.get(job_id)
+    if not job or job["kind"] != "report":
+        return jsonify({"message": "Report not found"}), 404
+    if job["status"] != "done":
+        return jsonify({"message": f"Report is {job['status']}"}), 409
+
+    extension = "csv" if job["result"]["format"] == "csv" else "ndjson"
+    return send_file(
+        jobs.store.result_path(job_id),
+        mimetype="application/gzip",
+        as_attachment=True,
+        download_name=f"{job['params']['report']}.{extension}.gz"
+    )
+
 
 # 🗂️ Get all categories
 @admin_bp.route('/categories', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def get_categories():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    categories = Category.query.all()
-    return jsonify([{"id": c.id, "name": c.name} for c in categories])
+    return jsonify(categories.all())
 
 # ➕ Add a new category
 @admin_bp.route('/categories/add', methods=['POST'])
 @jwt_required(locations=["headers"])
+@admin_only
 def add_category():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
     data = request.get_json()
     name = data.get("name")
 
@@ -94,16 +146,16 @@ def add_category():
     new_cat = Category(name=name)
     db.session.add(new_cat)
     db.session.commit()
+    categories.invalidate()
+    response_cache.bump()
 
     return jsonify({"message": "Category added", "id": new_cat.id}), 201
 
 # ✏️ Update a category name
 @admin_bp.route('/categories/update/<int:id>', methods=['PUT'])
 @jwt_required(locations=["headers"])
+@admin_only
 def update_category(id):
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
     data = request.get_json()
     new_name = data.get("name")
 
@@ -119,16 +171,16 @@ def update_category(id):
 
     category.name = new_name
     db.session.commit()
+    categories.invalidate()
+    response_cache.bump()
 
     return jsonify({"message": f"Category updated to '{new_name}'"}), 200
 
 
 @admin_bp.route('/categories/delete/<int:id>', methods=['DELETE'])
 @jwt_required(locations=["headers"])
+@admin_only
 def delete_category(id):
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
     category = Category.query.get(id)
     if not category:
         return jsonify({"message": "Category not found"}), 404
@@ -142,6 +194,8 @@ def delete_category(id):
 
     db.session.delete(category)
     db.session.commit()
+    categories.invalidate()
+    response_cache.bump()
     return jsonify({"message": "Category deleted"}), 200
 
 
@@ -149,167 +203,150 @@ def delete_category(id):
 # Get category usage statistics
 @admin_bp.route('/categories/stats', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def category_stats():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    usage = db.session.query(
-        Transaction.category_id,
-        func.count().label("count"),
-        func.sum(Transaction.amount).label("total_spent")
-    ).group_by(Transaction.category_id).all()
-
-    result = []
-    for cat_id, txn_count, total in usage:
-        category = Category.query.get(cat_id)
-        if category:
-            result.append({
-                "category": category.name,
-                "transactions": txn_count,
-                "total_spent": total
-            })
-
-    return jsonify(result), 200
+    try:
+        page, per_page = analytics.page_args(request.args, default_per_page=analytics.MAX_PER_PAGE)
+        start, end = analytics.window_args(request.args)
+        return response_cache.respond(lambda: analytics.category_stats(
+            start=start,
+            end=end,
+            sort=request.args.get("sort", "transactions"),
+            order=request.args.get("order", "desc"),
+            page=page,
+            per_page=per_page
+        ))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
 
 from sqlalchemy import case
 
-@admin_bp.route('/categories/summary', methods=['GET'])
+# 📐 Median / p90 (or any ?q=) expense amount per category, from the percentile sketches
+@admin_bp.route('/categories/percentiles', methods=['GET'])
 @jwt_required(locations=["headers"])
-def category_summary():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    # Total spent
-    total_spent = db.session.query(
-        func.sum(Transaction.amount)
-    ).filter(Transaction.type == 'expense').scalar() or 0
+@admin_only
+def category_percentiles():
+    try:
+        start, end = analytics.window_args(request.args)
+        quantiles = [float(q) for q in request.args.get("q", "0.5,0.9").split(",")]
+        if not all(0 <= q <= 1 for q in quantiles):
+            raise ValueError("q values must be between 0 and 1")
+    except ValueError as e:
+        return jsonify({"message": f"Invalid query parameters: {e}"}), 400
+
+    def compute():
+        sketches = percentiles.category_percentiles(start, end)
+        return [{
+            "category_id": category_id,
+            "category": categories.name(category_id) or "Uncategorized",
+            "transactions": sketch.count,
+            "percentiles": {f"p{q * 100:g}": sketch.quantile(q) for q in quantiles}
+        } for category_id, sketch in sorted(sketches.items())]
+
+    return response_cache.respond(compute)
 
-    # Total transactions
-    total_txns = db.session.query(func.count()).scalar()
 
-    # Most used category
-    usage = db.session.query(
-        Transaction.category_id,
-        func.count().label("count")
-    ).group_by(Transaction.category_id).order_by(func.count().desc()).first()
-
-    top_category = None
-    if usage:
-        category = Category.query.get(usage.category_id)
-        if category:
-            top_category = category.name
+@admin_bp.route('/categories/summary', methods=['GET'])
+@jwt_required(locations=["headers"])
+@admin_only
+def category_summary():
+    def compute():
+        total_spent, total_txns, top_category_id = rollups.category_summary()
+        return {
+            "total_spent": float(total_spent),
+            "total_transactions": total_txns,
+            "top_category": categories.name(top_category_id) or "N/A"
+        }
 
-    return jsonify({
-        "total_spent": float(total_spent),
-        "total_transactions": total_txns,
-        "top_category": top_category or "N/A"
-    }), 200
+    return response_cache.respond(compute)
 
 
 @admin_bp.route('/analytics-summary', methods=['GET'])
 @jwt_required()
+@admin_only
 def analytics_summary():
-    from ..models import User, Transaction
-
-    total_users = User.query.count()
-    total_txns = Transaction.query.count()
-
-    today = date.today()
-    active_today = db.session.query(Transaction.user_id).filter(
-        func.date(Transaction.timestamp) == today
-    ).distinct().count()
+    def compute():
+        today = date.today()
+        return {
+            'total_users': User.query.count(),
+            'transactions': Transaction.query.count(),
+            'active_today': activity.active_users(today, today)
+        }
 
-    return jsonify({
-        'total_users': total_users,
-        'transactions': total_txns,
-        'active_today': active_today
-    }), 200
+    return response_cache.respond(compute)
 
 
 @admin_bp.route('/analytics-trends', methods=['GET'])
 @jwt_required()
+@admin_only
 def analytics_trends():
-    from ..models import Transaction
-    from datetime import timedelta
-
-    today = date.today()
-    trends = []
-
-    for i in range(6, -1, -1):  
-        day = today - timedelta(days=i)
-        txns_count = db.session.query(Transaction).filter(
-            func.date(Transaction.timestamp) == day
-        ).count()
-
-        trends.append({
-            'day': day.strftime('%d-%b'),
-            'users': 0,  
-            'txns': txns_count
-        })
-
-    return jsonify(trends), 200
+    granularity = request.args.get("granularity", "day")
+    try:
+        periods = int(request.args.get("periods", 7))
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else date.today()
+        if request.args.get("start"):
+            start = date.fromisoformat(request.args["start"])
+        else:
+            if periods < 1:
+                raise ValueError("periods must be positive")
+            if periods > trends.MAX_BUCKETS:
+                raise ValueError(f"At most {trends.MAX_BUCKETS} buckets per request")
+            start = trends.bucket_start(end, granularity)
+            for _ in range(periods - 1):
+                start = trends.bucket_start(start - timedelta(days=1), granularity)
+        return response_cache.respond(lambda: trends.trends(start, end, granularity))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
 
 @admin_bp.route('/categories/type-breakdown', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def income_expense_by_category():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    results = db.session.query(
-        Transaction.category_id,
-        Transaction.type,
-        func.sum(Transaction.amount)
-    ).group_by(Transaction.category_id, Transaction.type).all()
-
-    data = {}
-    for category_id, txn_type, total in results:
-        category = Category.query.get(category_id)
-        if not category:
-            continue
-        name = category.name
-        if name not in data:
-            data[name] = {"category": name, "income": 0, "expense": 0}
-        data[name][txn_type] = float(total)
-
-    return jsonify(list(data.values())), 200
+    try:
+        page, per_page = analytics.page_args(request.args, default_per_page=analytics.MAX_PER_PAGE)
+        start, end = analytics.window_args(request.args)
+        return response_cache.respond(lambda: analytics.type_breakdown(
+            start=start,
+            end=end,
+            sort=request.args.get("sort", "category"),
+            order=request.args.get("order", "asc"),
+            page=page,
+            per_page=per_page
+        ))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
 
 @admin_bp.route('/dashboard/summary', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def admin_dashboard_summary():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    total_users = db.session.query(User).count()
+    def compute():
+        # Active users = those who made any transaction in last 7 days
+        today = datetime.utcnow().date()
+        return {
+            "total_users": db.session.query(User).count(),
+            "active_users": activity.active_users(today - timedelta(days=7), today),
+            "category_count": len(categories.all())
+        }
 
-    # Active users = those who made any transaction in last 7 days
-    from datetime import datetime, timedelta
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-    active_user_ids = db.session.query(Transaction.user_id).filter(Transaction.timestamp >= one_week_ago).distinct()
-    active_users = active_user_ids.count()
-
-    category_count = db.session.query(Category).count()
-
-    return jsonify({
-        "total_users": total_users,
-        "active_users": active_users,
-        "category_count": category_count
-    }), 200
+    return response_cache.respond(compute)
 
 @admin_bp.route('/user-list', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def user_list():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
-    users = User.query.all()
-    result = [{
-        "id": u.id,
-        "email": u.email,
-        "role": u.role
-    } for u in users]
+    try:
+        result = directory.search(
+            prefix=request.args.get("q"),
+            role=request.args.get("role"),
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", directory.DEFAULT_LIMIT)
+        )
+    except ValueError as e:
+        return jsonify({"message": f"Invalid query parameters: {e}"}), 400
 
     return jsonify(result), 200
 
@@ -317,10 +354,8 @@ def user_list():
 # Promote user to admin
 @admin_bp.route('/promote/<int:user_id>', methods=['POST'])
 @jwt_required(locations=["headers"])
+@admin_only
 def promote_user(user_id):
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
-
     user = User.query.get(user_id)
     if not user:
         return jsonify({"message": "User not found"}), 404
@@ -330,15 +365,31 @@ def promote_user(user_id):
 
     user.role = "admin"
     db.session.commit()
+    roles.set(user.id, user.role)
 
     return jsonify({"message": f"{user.email} promoted to admin."}), 200
 
 # 🧑‍💼 List all admin users
 @admin_bp.route('/list', methods=['GET'])
 @jwt_required(locations=["headers"])
+@admin_only
 def list_admins():
-    if not admin_required():
-        return jsonify({"message": "Admins only"}), 403
+    try:
+        result = directory.search(
+            prefix=request.args.get("q"),
+            role="admin",
+            cursor=request.args.get("cursor"),
+            limit=request.args.get("limit", directory.DEFAULT_LIMIT)
+        )
+    except ValueError as e:
+        return jsonify({"message": f"Invalid query parameters: {e}"}), 400
+
+    return jsonify(result), 200
 
-    admins = User.query.filter_by(role="admin").all()
-    return jsonify([{"id": admin.id, "email": admin.email} for admin in admins]), 200
+
+# 📈 Response cache hit/miss counters
+@admin_bp.route('/cache/stats', methods=['GET'])
+@jwt_required(locations=["headers"])
+@admin_only
+def cache_stats():
+    return jsonify(response_cache.stats()), 200
@@ -0,0 +1,96 @@
+"""Time-bucketed transaction trends from a single range-filtered GROUP BY."""
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from ..extensions import db
+from ..models import Transaction
+
+GRANULARITIES = ("day", "week", "month")
+MAX_BUCKETS = 366
+
+
+def bucket_start(day, granularity):
+    """First day of the bucket containing ``day`` (weeks start on Monday)."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, granularity):
+    if granularity == "week":
+        return day + timedelta(days=7)
+    if granularity == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def bucket_expr(column, granularity):
+    """SQL expression mapping a timestamp to the first day of its bucket."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.date(func.date_trunc(granularity, column))
+    if dialect == "mysql":
+        if granularity == "week":
+            return func.subdate(func.date(column), func.weekday(column))
+        if granularity == "month":
+            return func.date_format(column, "%Y-%m-01")
+        return func.date(column)
+    # SQLite
+    if granularity == "week":
+        return func.date(column, "weekday 0", "-6 days")
+    if granularity == "month":
+        return func.strftime("%Y-%m-01", column)
+    return func.date(column)
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def trends(start, end, granularity="day"):
+    """Transaction count, total amount and distinct active users per bucket.
+
+    ``start`` and ``end`` are dates (inclusive) and are widened to whole
+    buckets. Only a range predicate is applied to ``timestamp`` so the
+    index on it can be used; empty buckets are filled with zeros.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    start = bucket_start(start, granularity)
+    end = next_bucket(bucket_start(end, granularity), granularity)
+    if start >= end:
+        raise ValueError("start must not be after end")
+
+    buckets = []
+    day = start
+    while day < end:
+        buckets.append(day)
+        day = next_bucket(day, granularity)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"At most {MAX_BUCKETS} buckets per request")
+
+    bucket = bucket_expr(Transaction.timestamp, granularity).label("bucket")
+    rows = db.session.query(
+        bucket,
+        func.count(),
+        func.coalesce(func.sum(Transaction.amount), 0),
+        func.count(func.distinct(Transaction.user_id))
+    ).filter(
+        Transaction.timestamp >= datetime.combine(start, datetime.min.time()),
+        Transaction.timestamp < datetime.combine(end, datetime.min.time())
+    ).group_by(bucket).all()
+
+    found = {_as_date(b): (txns, total, users) for b, txns, total, users in rows}
+    label = "%b %Y" if granularity == "month" else "%d-%b"
+    result = []
+    for day in buckets:
+        txns, total, users = found.get(day, (0, 0, 0))
+        result.append({
+            "day": day.strftime(label),
+            "start": day.isoformat(),
+            "users": users,
+            "txns": txns,
+            "total": float(total)
+        })
+    return result
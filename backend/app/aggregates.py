@@ -0,0 +1,105 @@
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from .extensions import db, socketio
+
+
+def increment(model, keys, deltas):
+    """Atomically add ``deltas`` to the row of ``model`` identified by ``keys``.
+
+    The row is created from the deltas when it does not exist yet. MySQL,
+    PostgreSQL and SQLite use a native upsert so concurrent writers never
+    race on the insert; other backends fall back to a locked read-modify-write.
+    """
+    table = model.__table__
+    values = {**keys, **deltas}
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(values)
+        stmt = stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in deltas})
+    elif dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(table).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: table.c[c] + stmt.excluded[c] for c in deltas}
+        )
+    else:
+        row = db.session.get(model, tuple(keys.values()), with_for_update=True)
+        if row is None:
+            db.session.add(model(**values))
+        else:
+            for column, delta in deltas.items():
+                setattr(row, column, getattr(row, column) + delta)
+        return
+
+    db.session.execute(stmt)
+
+
+def locked_row(model, keys, **defaults):
+    """Fetch the row of ``model`` identified by ``keys`` with a row lock, creating it if missing.
+
+    For read-modify-write updates (e.g. sketch blobs) that an upsert can't
+    express. A concurrent insert of the same key is detected through the
+    savepoint and the winner's row is locked and returned instead.
+    """
+    ident = tuple(keys.values())
+    row = db.session.get(model, ident, with_for_update=True, populate_existing=True)
+    if row is not None:
+        return row
+    try:
+        with db.session.begin_nested():
+            row = model(**keys, **defaults)
+            db.session.add(row)
+        return row
+    except IntegrityError:
+        return db.session.get(model, ident, with_for_update=True, populate_existing=True)
+
+
+class Compactor:
+    """Runs ``compact()`` in a background task after commits that appended deltas.
+
+    ``compact`` folds at most ``batch_size`` pending delta rows into their
+    shared row, commits and returns how many it folded. At most one
+    compaction runs per process, and a new one starts no more than every
+    ``interval`` seconds; deltas arriving in between wait for the next one
+    (reads include them either way).
+    """
+
+    def __init__(self, compact, batch_size, interval, name):
+        self.compact = compact
+        self.batch_size = batch_size
+        self.interval = interval
+        self.name = name
+        self._lock = threading.Lock()
+        self._running = False
+        self._last = 0.0
+
+    def schedule(self):
+        app = current_app._get_current_object()
+        event.listen(db.session(), "after_commit", lambda session: self._start(app), once=True)
+
+    def _start(self, app):
+        with self._lock:
+            if self._running or time.monotonic() - self._last < self.interval:
+                return
+            self._running = True
+        socketio.start_background_task(self._run, app)
+
+    def _run(self, app):
+        with app.app_context():
+            try:
+                while self.compact() == self.batch_size:
+                    socketio.sleep(0)
+            except Exception:
+                app.logger.exception("%s compaction failed", self.name)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+                with self._lock:
+                    self._running = False
+                    self._last = time.monotonic()
@@ -0,0 +1,70 @@
+"""Advice generation shared by the synchronous and job-based endpoints."""
+from flask import current_app
+from ..extensions import db
+from ..models import User
+from ..jobs import JobRunner
+from . import insights
+from .cache import advice_cache, prompt_key, version_key
+from .llm import get_client
+from .prompt import build_prompt
+
+# Separate from the report pool so slow model calls never queue behind exports
+advice_jobs = JobRunner(workers="ADVICE_WORKERS", max_pending="ADVICE_MAX_PENDING")
+
+
+def cached_advice(user_id):
+    """Advice for the user's current transaction state if it is cached, else None."""
+    version = db.session.query(User.event_version).filter(User.id == user_id).scalar()
+    return advice_cache.get(version_key(user_id, version))
+
+
+def generate_advice(user_id):
+    """Return ``{"advice", "cached", "source"}`` for ``user_id``.
+
+    The model is called only on a cache miss. If it fails or times out the
+    local insights are returned instead (``source`` "insights") and nothing
+    is cached, so the next request tries the model again.
+    """
+    # Any transaction write bumps the version, so an unchanged version means unchanged data
+    version = db.session.query(User.event_version).filter(User.id == user_id).scalar()
+    by_version = version_key(user_id, version)
+    advice = advice_cache.get(by_version)
+    if advice is not None:
+        return {"advice": advice, "cached": True, "source": "model"}
+
+    client = get_client()
+    prompt = build_prompt(user_id)
+
+    # Writes that net out (e.g. an edit that was undone) produce the same prompt again
+    by_prompt = prompt_key(client.name, prompt)
+    advice = advice_cache.get(by_prompt)
+    if advice is not None:
+        advice_cache.set([by_version], advice)
+        return {"advice": advice, "cached": True, "source": "model"}
+
+    try:
+        advice = client.generate(prompt, timeout=current_app.config["LLM_TIMEOUT"])
+    except Exception:
+        current_app.logger.warning("Advice model call failed; falling back to local insights", exc_info=True)
+        return instant_advice(user_id)
+
+    advice_cache.set([by_version, by_prompt], advice)
+    return {"advice": advice, "cached": False, "source": "model"}
+
+
+def instant_advice(user_id):
+    """Local insights in the ``generate_advice`` shape, for answering before the model does."""
+    return {"advice": insights.as_advice(insights.compute(user_id)), "cached": False, "source": "insights"}
+
+
+def run_job(params, out):
+    """Job body for /ai/advice."""
+    result = generate_advice(params["user_id"])
+    out.write(result["advice"])
+    return result
+
+
+def submit_job(user_id):
+    """Queue model advice for ``user_id``, reusing a job already in flight; raises QueueFull."""
+    return advice_jobs.submit("advice", user_id, {"user_id": int(user_id)}, run_job, "advice_ready",
+                              dedupe_key=int(user_id))
@@ -0,0 +1,84 @@
+"""Persistent cache for generated advice.
+
+Entries live in a local SQLite file so they survive restarts and are
+shared by every worker on the host. Each entry expires ADVICE_CACHE_TTL
+seconds after it was written, and once the table holds more than
+ADVICE_CACHE_MAX_ENTRIES rows the least recently read ones are evicted.
+"""
+import hashlib
+import os
+import sqlite3
+import time
+from flask import current_app
+
+
+def prompt_key(model, prompt):
+    """Content address of a generation request."""
+    return "prompt:" + hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+
+def version_key(user_id, version):
+    """Key for a user's advice at a given transaction event version."""
+    return f"user:{user_id}:v{version}"
+
+
+class AdviceCache:
+    def __init__(self):
+        self._ready = set()
+
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across threads and processes
+        path = current_app.config["ADVICE_CACHE_PATH"]
+        if path in self._ready:
+            return sqlite3.connect(path, timeout=5, isolation_level=None)
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS advice ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_advice_accessed_at ON advice (accessed_at)")
+        self._ready.add(path)
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT value FROM advice WHERE key = ? AND created_at > ?",
+                (key, now - current_app.config["ADVICE_CACHE_TTL"])
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE advice SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0]
+        finally:
+            conn.close()
+
+    def set(self, keys, value):
+        """Store ``value`` under every key in ``keys`` and evict past the size cap."""
+        now = time.time()
+        config = current_app.config
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO advice (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    [(key, value, now, now) for key in keys]
+                )
+                conn.execute("DELETE FROM advice WHERE created_at <= ?", (now - config["ADVICE_CACHE_TTL"],))
+                conn.execute(
+                    "DELETE FROM advice WHERE key IN ("
+                    "SELECT key FROM advice ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (config["ADVICE_CACHE_MAX_ENTRIES"],)
+                )
+        finally:
+            conn.close()
+
+
+advice_cache = AdviceCache()
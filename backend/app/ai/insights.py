@@ -0,0 +1,190 @@
+"""Rule-based spending insights computed locally with NumPy.
+
+The user's recent history is loaded once into column arrays (amount,
+type, category, day) and every statistic below is a vectorized pass
+over them: week-over-week deltas, category shares, per-category amount
+anomalies and a month-end run-rate projection. It answers in a few
+milliseconds, so it backs /ai/insights, answers /ai/advice while the
+model's advice is still being generated, and stands in for the model when
+generation fails or times out.
+"""
+import calendar
+from datetime import date, datetime, timedelta
+import numpy as np
+from ..extensions import db
+from ..models import Transaction
+from ..categories import categories
+
+HISTORY_DAYS = 180
+WOW_MIN_CHANGE = 0.25  # flag week-over-week moves of at least 25%...
+WOW_MIN_AMOUNT = 500   # ...and at least this many rupees
+SHARE_THRESHOLD = 0.40
+ANOMALY_Z = 3.0
+ANOMALY_MIN_SAMPLES = 5
+MAX_ANOMALIES = 3
+
+
+class History:
+    """A user's recent transactions as parallel NumPy arrays."""
+
+    def __init__(self, rows, today):
+        self.today = np.datetime64(today, "D")
+        if rows:
+            amounts, types, category_ids, timestamps = zip(*rows)
+        else:
+            amounts, types, category_ids, timestamps = (), (), (), ()
+        self.amount = np.asarray(amounts, dtype=np.float64)
+        self.expense = np.asarray(types, dtype=object) == "expense"
+        self.category = np.asarray([c or 0 for c in category_ids], dtype=np.int64)
+        self.day = np.asarray([ts.date() for ts in timestamps], dtype="datetime64[D]")
+        self.age = (self.today - self.day).astype(np.int64)  # days ago, 0 = today
+
+    @classmethod
+    def load(cls, user_id, today=None):
+        today = today or date.today()
+        since = datetime.combine(today - timedelta(days=HISTORY_DAYS), datetime.min.time())
+        rows = db.session.query(Transaction.amount, Transaction.type, Transaction.category_id, Transaction.timestamp) \
+            .filter(Transaction.user_id == user_id, Transaction.timestamp >= since).all()
+        return cls(rows, today)
+
+
+def _name(category_id):
+    return categories.name(int(category_id)) or "Uncategorized"
+
+
+def _money(amount):
+    return f"₹{amount:,.0f}"
+
+
+def _category_totals(history, mask):
+    """Expense total per category id over ``mask`` as a dict."""
+    ids, inverse = np.unique(history.category[mask], return_inverse=True)
+    totals = np.bincount(inverse, weights=history.amount[mask], minlength=len(ids))
+    return dict(zip(ids.tolist(), totals.tolist()))
+
+
+def week_over_week(history):
+    this_week = history.expense & (history.age < 7)
+    last_week = history.expense & (history.age >= 7) & (history.age < 14)
+    current, previous = _category_totals(history, this_week), _category_totals(history, last_week)
+
+    insights = []
+    total_now, total_before = history.amount[this_week].sum(), history.amount[last_week].sum()
+    if total_before > 0:
+        change = (total_now - total_before) / total_before
+        if abs(change) >= WOW_MIN_CHANGE:
+            insights.append({
+                "kind": "week_over_week",
+                "severity": "warning" if change > 0 else "info",
+                "message": f"{'📈' if change > 0 else '📉'} You spent {_money(total_now)} in the last 7 days, "
+                           f"{abs(change):.0%} {'more' if change > 0 else 'less'} than the week before.",
+                "change": change
+            })
+
+    for category_id in current.keys() | previous.keys():
+        now, before = current.get(category_id, 0.0), previous.get(category_id, 0.0)
+        if before > 0 and now - before >= WOW_MIN_AMOUNT and (now - before) / before >= WOW_MIN_CHANGE:
+            insights.append({
+                "kind": "category_week_over_week",
+                "severity": "warning",
+                "message": f"⬆️ {_name(category_id)} rose to {_money(now)} this week from {_money(before)}.",
+                "category_id": category_id,
+                "change": (now - before) / before
+            })
+    return insights
+
+
+def category_shares(history):
+    month = history.expense & (history.age < 30)
+    totals = _category_totals(history, month)
+    spent = sum(totals.values())
+    if spent <= 0:
+        return []
+    return [{
+        "kind": "category_share",
+        "severity": "warning",
+        "message": f"📊 {_name(category_id)} took {total / spent:.0%} of your spending in the last 30 days.",
+        "category_id": category_id,
+        "share": total / spent
+    } for category_id, total in sorted(totals.items(), key=lambda t: -t[1]) if total / spent >= SHARE_THRESHOLD]
+
+
+def anomalies(history):
+    """Expenses in the last 7 days that sit ANOMALY_Z deviations above their category's mean."""
+    expense = history.expense
+    ids, inverse = np.unique(history.category[expense], return_inverse=True)
+    if not len(ids):
+        return []
+    amounts = history.amount[expense]
+    counts = np.bincount(inverse, minlength=len(ids))
+    means = np.bincount(inverse, weights=amounts, minlength=len(ids)) / counts
+    stds = np.sqrt(np.bincount(inverse, weights=(amounts - means[inverse]) ** 2, minlength=len(ids)) / counts)
+
+    z = np.divide(amounts - means[inverse], stds[inverse], out=np.zeros_like(amounts), where=stds[inverse] > 0)
+    flagged = (z >= ANOMALY_Z) & (counts[inverse] >= ANOMALY_MIN_SAMPLES) & (history.age[expense] < 7)
+    # Keep only the most extreme few, largest deviation first
+    flagged = np.flatnonzero(flagged)
+    flagged = flagged[np.argsort(-z[flagged])][:MAX_ANOMALIES]
+    return [{
+        "kind": "anomaly",
+        "severity": "warning",
+        "message": f"🚨 A {_money(amount)} {_name(category_id)} expense on {day} is far above your usual "
+                   f"{_money(mean)} for that category.",
+        "category_id": int(category_id),
+        "amount": float(amount),
+        "z": float(score)
+    } for amount, category_id, day, mean, score in zip(
+        amounts[flagged], ids[inverse][flagged], history.day[expense][flagged],
+        means[inverse][flagged], z[flagged]
+    )]
+
+
+def run_rate(history):
+    """Project month-end spending from the month-to-date pace."""
+    today = history.today.astype(object)
+    elapsed = today.day
+    days_in_month = calendar.monthrange(today.year, today.month)[1]
+    month_start = np.datetime64(today.replace(day=1), "D")
+    last_month_start = np.datetime64((today.replace(day=1) - timedelta(days=1)).replace(day=1), "D")
+
+    this_month = history.day >= month_start
+    spent = history.amount[history.expense & this_month].sum()
+    income = history.amount[~history.expense & this_month].sum()
+    last_month = history.amount[history.expense & (history.day >= last_month_start) & (history.day < month_start)].sum()
+    if spent <= 0:
+        return []
+
+    projected = spent / elapsed * days_in_month
+    insight = {
+        "kind": "run_rate",
+        "severity": "info",
+        "message": f"🗓️ At this pace you'll spend about {_money(projected)} this month "
+                   f"({_money(spent)} so far).",
+        "projected": projected,
+        "month_to_date": spent
+    }
+    if income > 0 and projected > income:
+        insight["severity"] = "warning"
+        insight["message"] += f" That's more than the {_money(income)} you've earned this month."
+    elif last_month > 0 and projected > last_month * (1 + WOW_MIN_CHANGE):
+        insight["severity"] = "warning"
+        insight["message"] += f" Last month you spent {_money(last_month)}."
+    return [insight]
+
+
+RULES = (anomalies, week_over_week, category_shares, run_rate)
+
+
+def compute(user_id, today=None):
+    """All insights for ``user_id``, warnings first."""
+    history = History.load(user_id, today)
+    insights = [insight for rule in RULES for insight in rule(history)]
+    insights.sort(key=lambda i: i["severity"] != "warning")
+    return {"transactions": int(len(history.amount)), "insights": insights}
+
+
+def as_advice(result):
+    """Render insights as the bullet list /ai/advice returns."""
+    if not result["insights"]:
+        return "✅ Nothing unusual in your recent spending. Keep tracking to get more tailored tips."
+    return "\n".join(i["message"] for i in result["insights"])
@@ -0,0 +1,70 @@
+"""Text-generation backends behind one small interface.
+
+LLM_BACKEND picks the implementation: "gemini" calls the Gemini API and
+"stub" answers locally after LLM_STUB_LATENCY seconds, so the advice
+pipeline (jobs, cache, sockets) can be exercised and load-tested offline.
+"""
+import hashlib
+import os
+import threading
+import time
+from flask import current_app
+
+
+class LLMClient:
+    name = None
+
+    def generate(self, prompt, timeout):
+        """Return the model's text for ``prompt``, giving up after ``timeout`` seconds."""
+        raise NotImplementedError
+
+
+class GeminiClient(LLMClient):
+    def __init__(self, model):
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        self.name = model
+        self._model = genai.GenerativeModel(model)
+
+    def generate(self, prompt, timeout):
+        response = self._model.generate_content(prompt, request_options={"timeout": timeout})
+        return response.text.strip()
+
+
+class StubClient(LLMClient):
+    """Deterministic canned advice; the same prompt always gets the same text."""
+    name = "stub"
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate(self, prompt, timeout):
+        time.sleep(min(self.latency, timeout))
+        if self.latency > timeout:
+            raise TimeoutError(f"stub generation exceeded {timeout}s")
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        return (
+            "📊 Review your top spending categories each week.\n"
+            "💡 Set a monthly cap for your largest expense category.\n"
+            "💰 Move part of every income straight into savings.\n"
+            f"🧪 (stub advice {digest})"
+        )
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide client for the configured LLM_BACKEND."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            config = current_app.config
+            if config["LLM_BACKEND"] == "stub":
+                _client = StubClient(config["LLM_STUB_LATENCY"])
+            elif config["LLM_BACKEND"] == "gemini":
+                _client = GeminiClient(config["LLM_MODEL"])
+            else:
+                raise ValueError(f"Unknown LLM_BACKEND {config['LLM_BACKEND']!r}")
+        return _client
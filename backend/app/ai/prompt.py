@@ -0,0 +1,132 @@
+"""Bounded-size advice prompts built from SQL aggregates.
+
+Instead of listing every transaction, the prompt summarises the user's
+history: lifetime totals and per-category spend from the rollups, the
+last few months per category, the most frequent notes and the largest
+recent expenses. Every query is grouped or limited, and the rendered
+text is capped at ADVICE_PROMPT_BUDGET characters, so prompt size and
+build time don't grow with the number of transactions.
+"""
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from ..extensions import db
+from ..models import DailyStat, Transaction, UserCategoryTotal
+from ..categories import categories
+from ..admin.trends import bucket_expr
+
+INSTRUCTIONS = (
+    "You're a smart, friendly budgeting assistant. "
+    "Analyze the user's spending summary below and provide short, actionable budgeting advice. "
+    "Respond with 5-12 concise bullet points using clear and motivating language. "
+    "Avoid over-explaining. Use emojis only at the start of each point.\n\n"
+)
+MONTHS = 6
+TOP_CATEGORIES = 10
+TOP_NOTES = 10
+NOTES_WINDOW_DAYS = 90
+OUTLIERS = 5
+OUTLIER_WINDOW_DAYS = 30
+
+
+def _money(amount):
+    return f"₹{amount:,.0f}"
+
+
+def _category(category_id):
+    return categories.name(category_id) or "Uncategorized"
+
+
+def _totals(user_id):
+    rows = db.session.query(UserCategoryTotal.category_id, UserCategoryTotal.type,
+                            UserCategoryTotal.total, UserCategoryTotal.count) \
+        .filter(UserCategoryTotal.user_id == user_id, UserCategoryTotal.count > 0).all()
+    income = sum(r.total for r in rows if r.type == "income")
+    expense = sum(r.total for r in rows if r.type == "expense")
+    count = sum(r.count for r in rows)
+    lines = [f"Lifetime: {count} transactions, income {_money(income)}, expenses {_money(expense)}."]
+
+    spend = sorted((r for r in rows if r.type == "expense"), key=lambda r: -r.total)[:TOP_CATEGORIES]
+    if spend:
+        lines.append("Top spending categories (lifetime):")
+        lines += [f"- {_category(r.category_id)}: {_money(r.total)} over {r.count} transactions" for r in spend]
+    return lines
+
+
+def first_of_month(today, months_back=0):
+    """The first day of the month ``months_back`` calendar months before ``today``'s."""
+    index = today.year * 12 + today.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _monthly(user_id):
+    # The current month plus the MONTHS - 1 before it
+    since = first_of_month(date.today(), MONTHS - 1)
+    month = bucket_expr(DailyStat.day, "month")
+    rows = db.session.query(month, DailyStat.category_id, DailyStat.type, func.sum(DailyStat.total)) \
+        .filter(DailyStat.user_id == user_id, DailyStat.day >= since, DailyStat.count > 0) \
+        .group_by(month, DailyStat.category_id, DailyStat.type) \
+        .order_by(month.desc()).all()
+    if not rows:
+        return []
+
+    lines = [f"Last {MONTHS} months (newest first):"]
+    by_month = {}
+    for bucket, category_id, txn_type, total in rows:
+        by_month.setdefault(str(bucket)[:7], []).append((category_id, txn_type, total))
+    for label, entries in by_month.items():
+        income = sum(t for _, kind, t in entries if kind == "income")
+        spent = sorted(((c, t) for c, kind, t in entries if kind == "expense"), key=lambda e: -e[1])
+        top = ", ".join(f"{_category(c)} {_money(t)}" for c, t in spent[:5])
+        lines.append(f"- {label}: income {_money(income)}, expenses {_money(sum(t for _, t in spent))}"
+                     + (f" ({top})" if top else ""))
+    return lines
+
+
+def _notes(user_id):
+    since = datetime.utcnow() - timedelta(days=NOTES_WINDOW_DAYS)
+    note = func.lower(func.trim(Transaction.note))
+    rows = db.session.query(note, func.count(), func.sum(Transaction.amount)) \
+        .filter(Transaction.user_id == user_id, Transaction.type == "expense",
+                Transaction.timestamp >= since, Transaction.note.isnot(None), Transaction.note != "") \
+        .group_by(note) \
+        .order_by(func.count().desc(), func.sum(Transaction.amount).desc()) \
+        .limit(TOP_NOTES).all()
+    if not rows:
+        return []
+    return [f"Most frequent expense notes (last {NOTES_WINDOW_DAYS} days):"] + \
+        [f"- \"{text[:60]}\": {count}x, {_money(total)}" for text, count, total in rows]
+
+
+def _outliers(user_id):
+    since = datetime.utcnow() - timedelta(days=OUTLIER_WINDOW_DAYS)
+    rows = db.session.query(Transaction.timestamp, Transaction.amount, Transaction.category_id, Transaction.note) \
+        .filter(Transaction.user_id == user_id, Transaction.type == "expense", Transaction.timestamp >= since) \
+        .order_by(Transaction.amount.desc()) \
+        .limit(OUTLIERS).all()
+    if not rows:
+        return []
+    return [f"Largest expenses (last {OUTLIER_WINDOW_DAYS} days):"] + [
+        f"- {ts:%Y-%m-%d}: {_money(amount)} on {_category(category_id)}" + (f" ({note[:60]})" if note else "")
+        for ts, amount, category_id, note in rows
+    ]
+
+
+def build_prompt(user_id, budget=None):
+    """Render the advice prompt for ``user_id`` within ``budget`` characters."""
+    budget = budget or current_app.config["ADVICE_PROMPT_BUDGET"]
+    user_id = int(user_id)
+    prompt, remaining = INSTRUCTIONS, budget - len(INSTRUCTIONS)
+
+    # Sections in priority order; whatever doesn't fit is dropped line by line
+    for section in (_totals, _monthly, _outliers, _notes):
+        lines = section(user_id)
+        for line in lines:
+            if len(line) + 1 > remaining:
+                return prompt.rstrip()
+            prompt += line + "\n"
+            remaining -= len(line) + 1
+        if lines and remaining > 1:
+            prompt += "\n"
+            remaining -= 1
+    return prompt.rstrip()
@@ -1,36 +1,61 @@
 from flask import Blueprint, jsonify, request, current_app,url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
-from ..models import Transaction,AudioNote
+from ..models import AudioNote
 from ..extensions import db
-import google.generativeai as genai
-import os
+from . import insights
+from .advice import advice_jobs, cached_advice, instant_advice, submit_job
+from ..jobs import QueueFull
 import time
 
 ai_bp = Blueprint('ai', __name__)
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))  
 
+# 💡 Advice without waiting on the model: cached advice, else local insights while the model runs in the background
 @ai_bp.route('/advice', methods=['GET'])
 @jwt_required()
 def get_advice():
     user_id = get_jwt_identity()
-    transactions = Transaction.query.filter_by(user_id=user_id).all()
+    advice = cached_advice(user_id)
+    if advice is not None:
+        return jsonify({"advice": advice, "cached": True, "source": "model", "job_id": None})
 
-    summary = ""
-    for t in transactions:
-        category = t.category.name if t.category else "Uncategorized"
-        summary += f"{t.type}: ₹{t.amount} on {category} - {t.note or 'No note'}\n"
+    # The model's answer arrives as an 'advice_ready' event and is cached for the next call
+    try:
+        job_id = submit_job(user_id)["id"]
+    except QueueFull:
+        job_id = None
+    return jsonify({**instant_advice(user_id), "job_id": job_id})
 
-    prompt = (
-        "You're a smart, friendly budgeting assistant. "
-        "Analyze the user's spending history below and provide short, actionable budgeting advice. "
-        "Respond with 5-12 concise bullet points using clear and motivating language. "
-        "Avoid over-explaining. Use emojis only at the start of each point.\n\n"
-        f"{summary}"
-    )
 
-    model = genai.GenerativeModel('models/gemini-1.5-flash')
-    response = model.generate_content(prompt)
+# 🧵 Generate advice in the background; the result arrives as an 'advice_ready' socket event or via polling
+@ai_bp.route('/advice', methods=['POST'])
+@jwt_required()
+def request_advice():
+    user_id = get_jwt_identity()
+    advice = cached_advice(user_id)
+    if advice is not None:
+        return jsonify({"status": "done", "result": {"advice": advice, "cached": True, "source": "model"}}), 200
+
+    try:
+        job = submit_job(user_id)
+    except QueueFull:
+        return jsonify({"message": "Advice is busy right now, please try again shortly"}), 429
+    # Local insights to show while the model works
+    return jsonify({**job, "preview": instant_advice(user_id)["advice"]}), 202
+
 
-    return jsonify({"advice": response.text.strip()})
+@ai_bp.route('/advice/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def advice_job_status(job_id):
+    job = advice_jobs.store.get(job_id)
+    if not job or job["kind"] != "advice" or job["owner_id"] != int(get_jwt_identity()):
+        return jsonify({"message": "Job not found"}), 404
+    return jsonify(job), 200
+
+
+# 📐 Instant rule-based insights (no model call)
+@ai_bp.route('/insights', methods=['GET'])
+@jwt_required()
+def get_insights():
+    return jsonify(insights.compute(int(get_jwt_identity()))), 200
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import Response, current_app, request
+from sqlalchemy import event
+from .extensions import db
+
+
+class MemoryBackend:
+    """In-process LRU store with per-entry TTLs, bounded by entry count and bytes."""
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._discard(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self._bytes}
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+
+BACKENDS = {"memory": MemoryBackend}
+
+
+class ResponseCache:
+    """Caches JSON responses keyed by route, query args and a global write version.
+
+    Transaction and category writes bump the version after they commit, so
+    every earlier entry stops matching at once; TTLs bound how stale a
+    response can get on workers that did not see the write.
+    """
+
+    def __init__(self):
+        self._backend = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            config = current_app.config
+            self._backend = BACKENDS[config["RESPONSE_CACHE_BACKEND"]](
+                max_entries=config["RESPONSE_CACHE_MAX_ENTRIES"],
+                max_bytes=config["RESPONSE_CACHE_MAX_BYTES"]
+            )
+        return self._backend
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+
+    def bump_on_commit(self):
+        """Bump the version once the current DB transaction commits."""
+        event.listen(db.session(), "after_commit", lambda session: self.bump(), once=True)
+
+    def respond(self, compute, ttl=None):
+        """Return the cached JSON response for this request, or build it with ``compute()``."""
+        key = f"{self._version}:{request.path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.args.items(multi=True)))}"
+        body = self.backend.get(key)
+        if body is None:
+            self.misses += 1
+            body = current_app.json.dumps(compute()).encode()
+            self.backend.set(key, body, ttl or current_app.config["RESPONSE_CACHE_TTL"])
+            status = "MISS"
+        else:
+            self.hits += 1
+            status = "HIT"
+        return Response(body, mimetype="application/json", headers={"X-Cache": status})
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "version": self._version, **self.backend.stats()}
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,71 @@
+import threading
+import time
+from flask import current_app
+from .extensions import db
+from .models import Category
+
+# Unknown ids/names trigger a reload at most this often, so bad input can't hammer the DB
+MISS_RELOAD_INTERVAL = 1.0
+
+
+class CategoryRegistry:
+    """Per-worker id→name / name→id view of the category table.
+
+    Categories change only through the admin category routes, which call
+    ``invalidate()`` to bump the version stamp; the next lookup reloads the
+    table. Other workers pick the change up after CATEGORY_CACHE_TTL seconds,
+    or immediately when they are asked for an id or name they do not know.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = 0
+        self._snapshot = (-1, 0.0, {}, {})  # (version, loaded_at, by_id, by_name)
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+
+    def _load(self, force=False):
+        version, loaded_at, by_id, by_name = self._snapshot
+        age = time.monotonic() - loaded_at
+        if force:
+            fresh = age < MISS_RELOAD_INTERVAL
+        else:
+            fresh = version == self._version and age < current_app.config.get("CATEGORY_CACHE_TTL", 300)
+        if fresh:
+            return by_id, by_name
+
+        with self._lock:
+            rows = db.session.query(Category.id, Category.name).order_by(Category.id).all()
+            by_id = {cid: name for cid, name in rows}
+            by_name = {name: cid for cid, name in rows}
+            self._snapshot = (self._version, time.monotonic(), by_id, by_name)
+        return by_id, by_name
+
+    def name(self, category_id):
+        """Return the category's name, or None if no such category exists."""
+        if category_id is None:
+            return None
+        by_id, _ = self._load()
+        if category_id not in by_id:
+            by_id, _ = self._load(force=True)
+        return by_id.get(category_id)
+
+    def id_for(self, name):
+        _, by_name = self._load()
+        if name not in by_name:
+            _, by_name = self._load(force=True)
+        return by_name.get(name)
+
+    def payload(self, category_id):
+        """The {"id", "name"} dict used in API responses, or None."""
+        name = self.name(category_id)
+        return {"id": category_id, "name": name} if name is not None else None
+
+    def all(self):
+        by_id, _ = self._load()
+        return [{"id": cid, "name": name} for cid, name in by_id.items()]
+
+
+categories = CategoryRegistry()
@@ -17,4 +17,29 @@ class Config:
     JWT_COOKIE_SECURE = False  
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  
     JWT_REFRESH_COOKIE_PATH = "/auth/refresh"
+    CATEGORY_CACHE_TTL = int(os.getenv("CATEGORY_CACHE_TTL", 300))
+    # "threading" (default; run.py picks eventlet), or "eventlet"/"gevent" with a monkey-patched standard library
+    SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+    # redis://..., amqp://..., unix:///run/finlogix (same host) or local:// (in-process, for tests)
+    SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    OUTBOX_POLL_INTERVAL = 1.0  # seconds between sweeps for undelivered events
+    OUTBOX_BATCH_SIZE = 100
+    EVENT_LOG_SIZE = 200  # events per user kept for reconnect replay
+    RESPONSE_CACHE_BACKEND = "memory"
+    RESPONSE_CACHE_TTL = 60  # seconds
+    RESPONSE_CACHE_MAX_ENTRIES = 512
+    RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
 
+    JOB_STORE_DIR = os.getenv("JOB_STORE_DIR", os.path.join(BASE_DIR, 'jobs'))
+    JOB_WORKERS = 2
+    JOB_RESULT_TTL = 24 * 60 * 60  # seconds a finished job's files are kept
+    ADVICE_CACHE_PATH = os.getenv("ADVICE_CACHE_PATH", os.path.join(BASE_DIR, 'cache', 'advice.sqlite3'))
+    ADVICE_CACHE_TTL = 24 * 60 * 60  # seconds
+    ADVICE_CACHE_MAX_ENTRIES = 10000
+    ADVICE_PROMPT_BUDGET = 6000  # characters, roughly 1.5k tokens
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" or "stub" (offline, for load tests)
+    LLM_MODEL = 'models/gemini-1.5-flash'
+    LLM_TIMEOUT = 30  # seconds per model call
+    LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", 0.5))
+    ADVICE_WORKERS = 4  # concurrent model calls per process
+    ADVICE_MAX_PENDING = 100
@@ -0,0 +1,169 @@
+"""Background jobs with results kept on the local filesystem.
+
+Work that would outlive a request runs on a fixed set of worker tasks
+inside an app context. Each job is a JSON metadata file plus a gzip result file in
+JOB_STORE_DIR, so any worker process on the host can answer status and
+download requests, and nothing beyond the app itself is needed. When a
+job finishes, its owner is told over Socket.IO.
+"""
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+from flask import current_app
+from .extensions import db, socketio
+from .realtime.events import emit_to_user
+
+
+class JobStore:
+    """One ``<id>.json`` metadata file and one ``<id>.gz`` result per job."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.json")
+
+    def result_path(self, job_id):
+        return os.path.join(self.root, f"{job_id}.gz")
+
+    def save(self, job):
+        # Write-then-rename so readers never see a half-written file
+        tmp = self._meta_path(job["id"]) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp, self._meta_path(job["id"]))
+
+    def get(self, job_id):
+        try:
+            uuid.UUID(hex=job_id)
+            with open(self._meta_path(job_id)) as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return None
+
+    def prune(self, max_age):
+        """Delete jobs (and their results) created more than ``max_age`` seconds ago."""
+        cutoff = time.time() - max_age
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+class QueueFull(Exception):
+    """Raised by ``JobRunner.submit`` when the pool already has its maximum of pending jobs."""
+
+
+class JobRunner:
+    """Worker pool sized by the ``workers`` config key.
+
+    Workers are Socket.IO background tasks fed from a queue created by the
+    Socket.IO server, so they follow SOCKETIO_ASYNC_MODE like the rest of
+    the realtime code. Jobs make blocking calls (database, LLM APIs), which
+    is why the app only accepts green async modes with a monkey-patched
+    standard library (see realtime.queue.socketio_options).
+
+    When ``max_pending`` names a config key, at most that many jobs may be
+    queued or running at once. Jobs submitted with a ``dedupe_key`` that is
+    still in flight return the existing job instead of queueing another.
+    """
+
+    def __init__(self, workers="JOB_WORKERS", max_pending=None):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._queue = None
+        self._store = None
+        self._in_flight = {}  # dedupe_key -> job id
+        self._pending = 0
+
+    @property
+    def store(self):
+        if self._store is None:
+            self._store = JobStore(current_app.config["JOB_STORE_DIR"])
+        return self._store
+
+    def _tasks(self):
+        """The job queue, starting the worker tasks on first use."""
+        with self._lock:
+            if self._queue is None:
+                self._queue = socketio.server.eio.create_queue()
+                for _ in range(current_app.config[self.workers]):
+                    socketio.start_background_task(self._worker, current_app._get_current_object())
+            return self._queue
+
+    def _worker(self, app):
+        while True:
+            args = self._queue.get()
+            try:
+                self._run(*args)
+            except Exception:
+                app.logger.exception("Job worker error")
+
+    def submit(self, kind, owner_id, params, work, event, dedupe_key=None):
+        """Queue ``work(params, out)`` and return the new job's metadata.
+
+        ``out`` is a text stream into the job's gzip result file; whatever
+        ``work`` returns is stored as the job's ``result`` summary. ``event``
+        is emitted to the owner with the final metadata when it finishes.
+        """
+        self.store.prune(current_app.config["JOB_RESULT_TTL"])
+        with self._lock:
+            if dedupe_key in self._in_flight:
+                job = self.store.get(self._in_flight[dedupe_key])
+                if job is not None:
+                    return job
+            if self.max_pending and self._pending >= current_app.config[self.max_pending]:
+                raise QueueFull(f"{kind} queue is full")
+
+            job = {
+                "id": uuid.uuid4().hex,
+                "kind": kind,
+                "owner_id": int(owner_id),
+                "params": params,
+                "status": "queued",
+                "created_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "error": None
+            }
+            self.store.save(job)
+            self._pending += 1
+            if dedupe_key is not None:
+                self._in_flight[dedupe_key] = job["id"]
+
+        app = current_app._get_current_object()
+        self._tasks().put((app, job, work, event, dedupe_key))
+        return job
+
+    def _run(self, app, job, work, event, dedupe_key):
+        with app.app_context():
+            self.store.save({**job, "status": "running"})
+            try:
+                with gzip.open(self.store.result_path(job["id"]), "wt", encoding="utf-8") as out:
+                    job["result"] = work(job["params"], out)
+                job["status"] = "done"
+            except Exception as e:
+                app.logger.exception("Job %s (%s) failed", job["id"], job["kind"])
+                job["status"], job["error"] = "failed", str(e)
+                db.session.rollback()
+            finally:
+                db.session.remove()
+
+            job["finished_at"] = time.time()
+            self.store.save(job)
+            with self._lock:
+                self._pending -= 1
+                if self._in_flight.get(dedupe_key) == job["id"]:
+                    del self._in_flight[dedupe_key]
+            emit_to_user(job["owner_id"], event, job)
+
+
+jobs = JobRunner()
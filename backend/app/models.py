@@ -1,14 +1,22 @@
 from .extensions import db
 from datetime import datetime
+from sqlalchemy.dialects import mysql
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(20), default='user')
+    # Bumped once per transaction_update event; clients replay from their last-seen value
+    event_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     transactions = db.relationship('Transaction', backref='user', lazy=True)
 
+    __table_args__ = (
+        # Admin user search: role filter plus email prefix, ordered by email
+        db.Index('ix_user_role_email', 'role', 'email'),
+    )
+
 
 class Category(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -27,8 +35,109 @@ class Transaction(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=True)
     audio_notes = db.relationship('AudioNote', backref='transaction', cascade='all,delete-orphan',passive_deletes=True)
 
+    # Serves the keyset-paginated /transactions/list: (user_id, timestamp desc, id desc)
+    __table_args__ = (
+        db.Index('ix_transaction_user_timestamp_id', 'user_id', 'timestamp', 'id'),
+        # Range scans across all users (admin trends / activity)
+        db.Index('ix_transaction_timestamp', 'timestamp'),
+    )
+
 
 class AudioNote(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     url = db.Column(db.String(255), nullable=False)
     transaction_id = db.Column(db.Integer, db.ForeignKey('transaction.id',ondelete='CASCADE'), nullable=False)
+
+
+class UserCategoryTotal(db.Model):
+    """Running per-user totals, maintained by deltas on every transaction write."""
+    __tablename__ = 'user_category_totals'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    # 0 stands in for "uncategorized" so the column can be part of the key
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    type = db.Column(db.String(10), primary_key=True)
+    total = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyStat(db.Model):
+    """Per-day rollup of transactions, maintained alongside UserCategoryTotal."""
+    __tablename__ = 'daily_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    # 0 stands in for "uncategorized", as in user_category_totals
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    type = db.Column(db.String(10), primary_key=True)
+    total = db.Column(db.Float, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DailyActivitySketch(db.Model):
+    """HyperLogLog sketch of the users with a transaction on ``day`` (see app/sketches.py)."""
+    __tablename__ = 'daily_activity_sketch'
+
+    day = db.Column(db.Date, primary_key=True)
+    registers = db.Column(db.LargeBinary, nullable=False)
+
+
+class ActivityDelta(db.Model):
+    """A user seen on ``day`` but not yet folded into that day's DailyActivitySketch.
+
+    Writes only ever insert here, so users' first transactions of the day
+    never lock the shared per-day sketch row; activity.compact() folds the
+    deltas into daily_activity_sketch after commit.
+    """
+    __tablename__ = 'activity_delta'
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    user_id = db.Column(db.Integer, nullable=False)
+
+
+class DailyCategorySketch(db.Model):
+    """Quantile sketch of the expense amounts per category per day (see app/sketches.py)."""
+    __tablename__ = 'daily_category_sketch'
+
+    day = db.Column(db.Date, primary_key=True)
+    # 0 stands in for "uncategorized", as in daily_stats
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    sketch = db.Column(db.Text, nullable=False)  # JSON
+
+
+class CategorySketchDelta(db.Model):
+    """Pending change to a DailyCategorySketch, appended by an expense write.
+
+    Writes only ever insert here, so concurrent expenses in the same
+    category and day never lock a shared row; percentiles.compact() folds
+    the deltas into daily_category_sketch after commit.
+    """
+    __tablename__ = 'category_sketch_delta'
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    category_id = db.Column(db.Integer, nullable=False)
+    sketch = db.Column(db.Text, nullable=False)  # JSON
+
+
+class OutboxEvent(db.Model):
+    """Socket.IO event written in the same commit as the change it announces.
+
+    Delivered rows double as the per-user event log that reconnecting
+    clients replay from; the newest EVENT_LOG_SIZE versions are kept.
+    """
+    __tablename__ = 'outbox_event'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    event = db.Column(db.String(50), nullable=False)
+    # JSON; MEDIUMTEXT on MySQL, where TEXT stops at 64 KB and a full batch event is larger
+    payload = db.Column(db.Text().with_variant(mysql.MEDIUMTEXT(), "mysql"), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    delivered_at = db.Column(db.DateTime, index=True)
+
+    __table_args__ = (
+        db.Index('ix_outbox_event_user_version', 'user_id', 'version'),
+    )
@@ -0,0 +1,142 @@
+"""Per-category spending percentiles from per-day quantile sketches.
+
+Every expense write appends the change to its (day, category) sketch as a
+small delta row (subtracting the old amount for edits and deletes), so
+concurrent writers never contend on a shared row. A background task folds
+the deltas into daily_category_sketch shortly after they commit, and reads
+merge both tables, so a distribution over any window is a merge of a few
+small JSON documents per day and category rather than a sort of the
+transaction table. Quantiles are within 1% of the true value (see
+QuantileSketch).
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, insert
+from .aggregates import Compactor, locked_row
+from .extensions import db
+from .models import CategorySketchDelta, DailyCategorySketch, Transaction
+from .sketches import QuantileSketch
+
+UNCATEGORIZED = 0  # same sentinel as transactions.ledger.UNCATEGORIZED
+DEFAULT_QUANTILES = (0.5, 0.9)
+SKETCH_FIELDS = ("day", "category_id", "type", "amount")
+COMPACT_BATCH_SIZE = 1000
+COMPACT_INTERVAL = 5.0  # seconds between background compactions per process
+
+
+def record(changes):
+    """Append sketch deltas for (before, after) ledger snapshot pairs to the current DB transaction."""
+    sketches = defaultdict(QuantileSketch)
+    for before, after in changes:
+        if before is not None and after is not None and all(before[k] == after[k] for k in SKETCH_FIELDS):
+            continue
+        for snap, sign in ((before, -1), (after, 1)):
+            if snap is not None and snap["type"] == "expense":
+                sketches[(snap["day"], snap["category_id"] or UNCATEGORIZED)].add(snap["amount"], sign)
+
+    deltas = [
+        {"day": day, "category_id": category_id, "sketch": sketch.to_json()}
+        for (day, category_id), sketch in sketches.items() if sketch.bins or sketch.zeros
+    ]
+    if deltas:
+        db.session.execute(insert(CategorySketchDelta), deltas)
+        compactor.schedule()
+
+
+def compact(batch_size=COMPACT_BATCH_SIZE):
+    """Fold up to ``batch_size`` pending deltas into daily_category_sketch and commit.
+
+    Returns how many deltas were folded. Deltas claimed by a concurrent
+    compaction are skipped, and each one is deleted in the same commit
+    that merges it, so none is ever counted twice.
+    """
+    deltas = CategorySketchDelta.query.order_by(CategorySketchDelta.id) \
+        .limit(batch_size) \
+        .with_for_update(skip_locked=True) \
+        .all()
+    if not deltas:
+        db.session.commit()
+        return 0
+
+    merged = defaultdict(QuantileSketch)
+    for delta in deltas:
+        merged[(delta.day, delta.category_id)].merge(QuantileSketch.from_json(delta.sketch))
+    # Sorted so concurrent compactions lock rows in the same order
+    for (day, category_id), sketch in sorted(merged.items()):
+        row = locked_row(DailyCategorySketch, {"day": day, "category_id": category_id}, sketch="{}")
+        row.sketch = QuantileSketch.from_json(row.sketch).merge(sketch).to_json()
+
+    CategorySketchDelta.query.filter(CategorySketchDelta.id.in_([d.id for d in deltas])) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return len(deltas)
+
+
+compactor = Compactor(compact, COMPACT_BATCH_SIZE, COMPACT_INTERVAL, "Sketch")
+
+
+def category_percentiles(start=None, end=None, quantiles=DEFAULT_QUANTILES):
+    """Expense count and quantiles per category over [start, end] (inclusive dates, either optional)."""
+    queries = []
+    for model in (DailyCategorySketch, CategorySketchDelta):
+        query = db.session.query(model.category_id, model.sketch)
+        if start is not None:
+            query = query.filter(model.day >= start)
+        if end is not None:
+            query = query.filter(model.day <= end)
+        queries.append(query)
+
+    # Compacted sketches plus the deltas not folded in yet, in one statement
+    merged = defaultdict(QuantileSketch)
+    for category_id, data in queries[0].union_all(queries[1]):
+        merged[category_id].merge(QuantileSketch.from_json(data))
+    return {category_id: sketch for category_id, sketch in merged.items() if sketch.count}
+
+
+percentiles_cli = AppGroup('percentiles', help="Maintain the per-day category spending sketches.")
+
+
+@percentiles_cli.command('compact')
+def compact_command():
+    """Fold every pending sketch delta into daily_category_sketch."""
+    folded = batch = compact()
+    while batch == COMPACT_BATCH_SIZE:
+        batch = compact()
+        folded += batch
+    click.echo(f"✅ Folded {folded} sketch deltas.")
+
+
+@percentiles_cli.command('rebuild')
+@click.option('--since', type=click.DateTime(formats=["%Y-%m-%d"]), help="First day to rebuild (default: earliest transaction).")
+def rebuild(since):
+    """Rebuild daily_category_sketch from the transaction table, one day per DB transaction."""
+    first_ts = db.session.query(func.min(Transaction.timestamp)).scalar()
+    if first_ts is None:
+        click.echo("No transactions to sketch.")
+        return
+
+    day = since.date() if since else first_ts.date()
+    rows = 0
+    while day <= date.today():
+        sketches = defaultdict(QuantileSketch)
+        amounts = db.session.query(Transaction.category_id, Transaction.amount).filter(
+            Transaction.type == "expense",
+            Transaction.timestamp >= datetime.combine(day, datetime.min.time()),
+            Transaction.timestamp < datetime.combine(day + timedelta(days=1), datetime.min.time())
+        ).yield_per(1000)
+        for category_id, amount in amounts:
+            sketches[category_id or UNCATEGORIZED].add(float(amount))
+
+        db.session.query(DailyCategorySketch).filter(DailyCategorySketch.day == day).delete()
+        db.session.query(CategorySketchDelta).filter(CategorySketchDelta.day == day).delete()
+        db.session.add_all([
+            DailyCategorySketch(day=day, category_id=category_id, sketch=sketch.to_json())
+            for category_id, sketch in sketches.items()
+        ])
+        rows += len(sketches)
+        db.session.commit()
+        day += timedelta(days=1)
+
+    click.echo(f"✅ Rebuilt {rows} daily category sketches.")
@@ -0,0 +1,54 @@
+from flask import request, session
+from flask_jwt_extended import decode_token
+from flask_socketio import join_room
+from ..extensions import socketio
+
+
+def user_room(user_id):
+    return f"user:{user_id}"
+
+
+def emit_to_user(user_id, event, payload):
+    """Deliver an event only to the sockets the user has open."""
+    socketio.emit(event, payload, to=user_room(user_id))
+
+
+# 🔌 Authenticate the socket with the same access token the REST API uses
+@socketio.on('connect')
+def handle_connect(auth=None):
+    token = (auth or {}).get("token")
+    if not token:
+        header = request.headers.get("Authorization", "")
+        token = header[7:] if header.startswith("Bearer ") else request.args.get("token")
+    if not token:
+        raise ConnectionRefusedError("Missing access token")
+
+    try:
+        claims = decode_token(token)
+    except Exception:
+        raise ConnectionRefusedError("Invalid or expired access token")
+    if claims.get("type") != "access":
+        raise ConnectionRefusedError("Access token required")
+
+    session["user_id"] = claims["sub"]
+    join_room(user_room(claims["sub"]))
+
+    # Make sure events left undelivered by a previous process get flushed
+    from .outbox import dispatcher
+    dispatcher.start()
+
+    # Train the user's category suggester off the request path before they start typing
+    from ..transactions.classifier import suggester
+    suggester.prefetch(claims["sub"])
+
+
+# 🔁 Reconnect delta-sync: the client sends its last-seen version and gets the missed events as the ack
+@socketio.on('sync')
+def handle_sync(data=None):
+    from .outbox import replay
+
+    try:
+        since = int((data or {}).get("since", 0))
+    except (TypeError, ValueError):
+        return {"error": "since must be an integer"}
+    return replay(session["user_id"], since)
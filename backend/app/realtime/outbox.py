@@ -0,0 +1,131 @@
+import json
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event, update
+from ..extensions import db, socketio
+from ..models import OutboxEvent, User
+from .events import emit_to_user
+
+
+def enqueue(user_id, event_name, payload):
+    """Stage a Socket.IO event in the current DB transaction.
+
+    The event is stamped with the user's next event version, which is added
+    to the payload as ``version``. Nothing is sent until the transaction
+    commits; the dispatcher then delivers it at least once. If the
+    transaction rolls back the event (and the version bump) is discarded
+    along with the change it describes.
+    """
+    user_id = int(user_id)
+    # The UPDATE row-locks the user, so concurrent writers get distinct, ordered versions
+    db.session.execute(update(User).where(User.id == user_id).values(event_version=User.event_version + 1))
+    version = db.session.query(User.event_version).filter(User.id == user_id).scalar()
+
+    db.session.add(OutboxEvent(
+        user_id=user_id,
+        version=version,
+        event=event_name,
+        payload=json.dumps({**payload, "version": version})
+    ))
+
+    # Trim the user's log to the newest EVENT_LOG_SIZE delivered versions now and then
+    log_size = current_app.config["EVENT_LOG_SIZE"]
+    if version % 50 == 0 and version > log_size:
+        OutboxEvent.query.filter(
+            OutboxEvent.user_id == user_id,
+            OutboxEvent.version <= version - log_size,
+            OutboxEvent.delivered_at.isnot(None)
+        ).delete(synchronize_session=False)
+
+    dispatcher.start()
+    event.listen(db.session(), "after_commit", lambda session: dispatcher.wake(), once=True)
+
+
+def replay(user_id, since):
+    """Events a client that last saw version ``since`` has missed.
+
+    Returns ``{"version", "events"}``, or ``{"version", "resync": True}``
+    when the gap is no longer covered by the log (or ``since`` is from the
+    future) and the client must reload /transactions/list instead.
+    """
+    current = db.session.query(User.event_version).filter(User.id == int(user_id)).scalar() or 0
+    if since == current:
+        return {"version": current, "events": []}
+    if since > current or current - since > current_app.config["EVENT_LOG_SIZE"]:
+        return {"version": current, "resync": True}
+
+    rows = db.session.query(OutboxEvent.version, OutboxEvent.event, OutboxEvent.payload) \
+        .filter(OutboxEvent.user_id == int(user_id), OutboxEvent.version > since) \
+        .order_by(OutboxEvent.version).all()
+    # A hole at the start means older events were already trimmed
+    if not rows or rows[0].version != since + 1:
+        return {"version": current, "resync": True}
+
+    return {
+        "version": current,
+        "events": [{"name": name, "data": json.loads(payload)} for _, name, payload in rows]
+    }
+
+
+class Dispatcher:
+    """Background task that drains undelivered OutboxEvent rows in batches.
+
+    It wakes immediately after a commit that staged events, and otherwise
+    polls every OUTBOX_POLL_INTERVAL seconds to pick up rows left behind by
+    a crash or by another worker. Rows are marked delivered only after the
+    emit, so delivery is at-least-once; clients de-duplicate by ``version``.
+
+    The task, its wake-up event and its sleeps all come from the Socket.IO
+    server, so they match SOCKETIO_ASYNC_MODE instead of assuming threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = None
+        self._app = None
+
+    def start(self):
+        with self._lock:
+            if self._app is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._wake = socketio.server.eio.create_event()
+        socketio.start_background_task(self._run)
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    def _run(self):
+        config = self._app.config
+        batch_size = config["OUTBOX_BATCH_SIZE"]
+        while True:
+            self._wake.wait(config["OUTBOX_POLL_INTERVAL"])
+            self._wake.clear()
+            with self._app.app_context():
+                try:
+                    # Keep draining while full batches come back, yielding between them
+                    while self.dispatch_batch(batch_size) == batch_size:
+                        socketio.sleep(0)
+                except Exception:
+                    current_app.logger.exception("Outbox dispatch failed")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+    def dispatch_batch(self, batch_size):
+        """Deliver up to ``batch_size`` pending events; returns how many were sent."""
+        events = OutboxEvent.query.filter(OutboxEvent.delivered_at.is_(None)) \
+            .order_by(OutboxEvent.id) \
+            .limit(batch_size) \
+            .with_for_update(skip_locked=True) \
+            .all()
+        for outbox_event in events:
+            emit_to_user(outbox_event.user_id, outbox_event.event, json.loads(outbox_event.payload))
+            outbox_event.delivered_at = datetime.utcnow()
+        db.session.commit()
+        return len(events)
+
+
+dispatcher = Dispatcher()
@@ -0,0 +1,135 @@
+import os
+import socket
+from collections import defaultdict
+from urllib.parse import urlparse
+import socketio
+
+# Largest message accepted on the UNIX socket backend (a 500-change batch event is ~100 KB)
+MAX_DATAGRAM = 4 * 1024 * 1024
+LISTEN_POLL_INTERVAL = 0.02  # seconds the UNIX backend sleeps when no message is waiting
+GREEN_ASYNC_MODES = ("eventlet", "gevent", "gevent_uwsgi")
+
+
+class LocalManager(socketio.PubSubManager):
+    """Message queue shared by every Socket.IO server in this process.
+
+    Lets tests run several "workers" (app instances) side by side and check
+    that an event emitted on one reaches clients connected to another.
+    """
+    name = 'local'
+    _subscribers = defaultdict(list)
+
+    def __init__(self, url='local://', channel='flask-socketio', write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self._inbox = None
+
+    def initialize(self):
+        if not self.write_only:
+            # The server's queue type matches its async mode, so get() yields to the hub under eventlet/gevent
+            self._inbox = self.server.eio.create_queue()
+            self._subscribers[self.channel].append(self._inbox)
+        super().initialize()
+
+    def _publish(self, data):
+        for inbox in self._subscribers[self.channel]:
+            if inbox is not self._inbox:
+                inbox.put(data)
+
+    def _listen(self):
+        while True:
+            yield self._inbox.get()
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    """Message queue for workers on one host, over UNIX datagram sockets.
+
+    Each serving worker binds ``<directory>/<channel>/<host_id>.sock`` once
+    its first client connects; publishing sends the message to every socket
+    in that directory. Sends never block: a peer whose buffer is full misses
+    the message, and sockets left behind by dead workers are removed the
+    first time a send to them is refused.
+    """
+    name = 'unix'
+
+    def __init__(self, url, channel='flask-socketio', write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.directory = os.path.join(urlparse(url).path or '/tmp/finlogix-socketio', channel)
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = None
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+
+    def initialize(self):
+        if not self.write_only:
+            self.path = os.path.join(self.directory, f"{self.host_id}.sock")
+            self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self._receiver.setblocking(False)
+            self._receiver.bind(self.path)
+        super().initialize()
+
+    def _publish(self, data):
+        message = self.json.dumps(data).encode()
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if peer == self.path:
+                continue
+            try:
+                self._sender.sendto(message, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except OSError as e:
+                self._get_logger().error(f"Failed to publish to {peer}: {e}")
+
+    def _listen(self):
+        # Drain whatever is waiting, then sleep through the server so the listener never blocks the hub
+        while True:
+            try:
+                message, _ = self._receiver.recvfrom(MAX_DATAGRAM)
+            except BlockingIOError:
+                self.server.sleep(LISTEN_POLL_INTERVAL)
+                continue
+            yield message
+
+
+def _monkey_patched(async_mode):
+    if async_mode == "eventlet":
+        import eventlet.patcher
+        return eventlet.patcher.is_monkey_patched("socket") and eventlet.patcher.is_monkey_patched("thread")
+    import gevent.monkey
+    return gevent.monkey.is_module_patched("socket") and gevent.monkey.is_module_patched("threading")
+
+
+def socketio_options(config):
+    """Translate the SOCKETIO_* config keys into SocketIO.init_app() keyword arguments.
+
+    SOCKETIO_ASYNC_MODE is always passed explicitly so engine.io never
+    picks eventlet just because it is installed. The outbox dispatcher,
+    the job runners and the database driver all block in ordinary
+    threads, so eventlet or gevent are only accepted once the standard
+    library has been monkey-patched (run.py does that for eventlet, and
+    so do gunicorn's eventlet/gevent workers).
+
+    For SOCKETIO_MESSAGE_QUEUE, ``local://`` and ``unix:///some/dir``
+    select the backends above; any other URL (redis://, amqp://, kafka://,
+    zmq+...) is handed to Flask-SocketIO's built-in managers. No URL means
+    a single worker.
+    """
+    async_mode = config["SOCKETIO_ASYNC_MODE"]
+    if async_mode in GREEN_ASYNC_MODES and not _monkey_patched(async_mode):
+        raise RuntimeError(
+            f"SOCKETIO_ASYNC_MODE={async_mode} needs a monkey-patched standard library; "
+            "patch it before importing the app or use SOCKETIO_ASYNC_MODE=threading"
+        )
+    options = {"async_mode": async_mode}
+
+    url = config["SOCKETIO_MESSAGE_QUEUE"]
+    if not url:
+        return options
+    if url.startswith('local://'):
+        return {**options, "client_manager": LocalManager(url)}
+    if url.startswith('unix://'):
+        return {**options, "client_manager": UnixSocketManager(url)}
+    return {**options, "message_queue": url}
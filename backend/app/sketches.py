@@ -0,0 +1,116 @@
+"""Small mergeable sketches stored as compact blobs in the database."""
+import json
+import math
+from hashlib import blake2b
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**P one-byte registers (4 KiB at P=12).
+
+    The standard error is 1.04 / sqrt(2**P), about 1.6% at P=12; below
+    roughly 10k distinct values linear counting takes over and estimates
+    are close to exact. Sketches of the same P merge by taking the
+    register-wise maximum, so per-day sketches combine into any window.
+    """
+    P = 12
+    M = 1 << P
+    ALPHA = 0.7213 / (1 + 1.079 / M)
+    _INVERSE_POWERS = [2.0 ** -r for r in range(64 - P + 2)]
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers else bytearray(self.M)
+
+    @classmethod
+    def position(cls, value):
+        """Register index and rank that ``value`` maps to."""
+        h = int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), "big")
+        rest = h & ((1 << (64 - cls.P)) - 1)
+        return h >> (64 - cls.P), (64 - cls.P) - rest.bit_length() + 1
+
+    def covers(self, value):
+        """True when adding ``value`` would not change the sketch."""
+        index, rank = self.position(value)
+        return self.registers[index] >= rank
+
+    def add(self, value):
+        index, rank = self.position(value)
+        if self.registers[index] < rank:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        estimate = self.ALPHA * self.M * self.M / sum(map(self._INVERSE_POWERS.__getitem__, self.registers))
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.M and zeros:
+            estimate = self.M * math.log(self.M / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative-error log buckets (DDSketch style).
+
+    A positive value lands in bucket ceil(log_gamma(value)); every value in
+    a bucket is within ALPHA (1%) of the bucket's representative, so any
+    quantile is returned with at most 1% relative error. Buckets hold plain
+    counts, so sketches merge by addition and a value can be removed again
+    by adding it with a negative count. Zero and negative values share one
+    bucket that reports 0.
+    """
+    ALPHA = 0.01
+    GAMMA = (1 + ALPHA) / (1 - ALPHA)
+    _LOG_GAMMA = math.log(GAMMA)
+
+    def __init__(self, bins=None, zeros=0):
+        self.bins = {int(k): v for k, v in (bins or {}).items()}
+        self.zeros = zeros
+
+    @classmethod
+    def from_json(cls, data):
+        state = json.loads(data) if data else {}
+        return cls(state.get("bins"), state.get("zeros", 0))
+
+    def to_json(self):
+        return json.dumps({"zeros": self.zeros, "bins": self.bins}, separators=(",", ":"), sort_keys=True)
+
+    def add(self, value, count=1):
+        if value <= 0:
+            self.zeros += count
+            return
+        key = math.ceil(math.log(value) / self._LOG_GAMMA)
+        self.bins[key] = self.bins.get(key, 0) + count
+        if self.bins[key] == 0:
+            del self.bins[key]
+
+    def merge(self, other):
+        self.zeros += other.zeros
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+            if self.bins[key] == 0:
+                del self.bins[key]
+        return self
+
+    @property
+    def count(self):
+        return max(self.zeros, 0) + sum(c for c in self.bins.values() if c > 0)
+
+    def quantile(self, q):
+        """Approximate ``q``-quantile (0 <= q <= 1), or None for an empty sketch."""
+        total = self.count
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = max(self.zeros, 0)
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            if self.bins[key] > 0:
+                seen += self.bins[key]
+                if rank < seen:
+                    return 2 * self.GAMMA ** key / (self.GAMMA + 1)
+        return 2 * self.GAMMA ** max(self.bins) / (self.GAMMA + 1)
@@ -0,0 +1,232 @@
+"""Category suggestions from transaction notes.
+
+A multinomial naive Bayes model over hashed features of the note: word
+unigrams and bigrams plus character trigrams, so "Uber*Trip 2231" and
+"uber trip" share most of their features. Each user gets a model trained
+on their own history, blended with a global model that covers users who
+have not categorized much yet.
+
+Models are trained by a background task and kept in an in-memory LRU;
+``suggest`` never trains inline. A model that isn't loaded yet is queued
+for training (the user's own model is also queued when their socket
+connects) and left out of the answer until it is ready, so suggestions
+fall back to the global model alone, or to none at all.
+
+Ledger changes update loaded models incrementally once their transaction
+commits; models that are not loaded simply pick the change up from the
+database when they are next trained. Each model remembers the id range
+it was trained on plus the rows added since, and a removal is applied
+only to a model that counted the row, so counts can't go negative.
+"""
+import math
+import re
+import threading
+import zlib
+from collections import OrderedDict, defaultdict
+from flask import current_app
+from sqlalchemy import event, func
+from ..extensions import db, socketio
+from ..models import Transaction
+
+FEATURE_BITS = 18
+FEATURE_SPACE = 1 << FEATURE_BITS
+SMOOTHING = 0.1
+MAX_USER_MODELS = 1000
+GLOBAL_TRAINING_ROWS = 200_000
+USER_WEIGHT_PRIOR = 20  # a user's own model gets weight n / (n + 20) after n notes
+
+_TOKEN = re.compile(r"[a-z]+|\d+")
+
+
+def features(note):
+    """Hashed feature ids for ``note`` (with repeats, as counts matter)."""
+    words = _TOKEN.findall(note.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"^{word}$"
+        grams += ["#" + padded[i:i + 3] for i in range(len(padded) - 2)]
+    return [zlib.crc32(g.encode()) & (FEATURE_SPACE - 1) for g in grams]
+
+
+class NaiveBayes:
+    def __init__(self):
+        self.docs = defaultdict(int)  # category_id -> notes seen
+        self.counts = defaultdict(lambda: defaultdict(int))  # category_id -> feature -> count
+        self.totals = defaultdict(int)  # category_id -> total feature count
+        self.n = 0
+        # Transaction ids low..high were in the training query; ids outside it
+        # are counted only once a committed change adds them
+        self.low, self.high = 0, -1
+        self.added = set()
+
+    def update(self, note, category_id, weight=1):
+        """Add (weight=1) or remove (weight=-1) one labelled note.
+
+        Counts never drop below zero, so removing a note the model did not
+        count can skew it slightly but can't break ``predict``.
+        """
+        if weight < 0 and self.docs.get(category_id, 0) <= 0:
+            return
+        self.docs[category_id] += weight
+        self.n += weight
+        counts = self.counts[category_id]
+        for f in features(note):
+            if counts.get(f, 0) + weight >= 0:
+                counts[f] += weight
+                self.totals[category_id] += weight
+        if self.docs[category_id] <= 0:
+            del self.docs[category_id], self.counts[category_id], self.totals[category_id]
+
+    def apply(self, txn_id, note, category_id, weight):
+        """Apply a committed change to transaction ``txn_id``, skipping rows the model never counted."""
+        if not self.low <= txn_id <= self.high:
+            if weight > 0:
+                self.added.add(txn_id)
+            elif txn_id in self.added:
+                self.added.discard(txn_id)
+            else:
+                return
+        self.update(note, category_id, weight)
+
+    def predict(self, feats):
+        """Posterior probability per category for pre-computed features."""
+        if self.n <= 0:
+            return {}
+        scores = {}
+        for category_id, docs in self.docs.items():
+            counts, denominator = self.counts[category_id], self.totals[category_id] + SMOOTHING * FEATURE_SPACE
+            score = math.log(docs / self.n)
+            for f in feats:
+                score += math.log((counts.get(f, 0) + SMOOTHING) / denominator)
+            scores[category_id] = score
+        top = max(scores.values())
+        exp = {c: math.exp(s - top) for c, s in scores.items()}
+        norm = sum(exp.values())
+        return {c: e / norm for c, e in exp.items()}
+
+
+class CategorySuggester:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._users = OrderedDict()  # user_id -> NaiveBayes, least recently used first
+        self._global = None
+        self._queue = None  # training requests: None for the global model, else a user id
+        self._requested = set()  # queued or training, so each model is trained once
+
+    def _train(self, query, high, limit=None):
+        model = NaiveBayes()
+        rows, low = 0, 0
+        for txn_id, note, category_id in query.yield_per(1000):
+            rows, low = rows + 1, txn_id
+            if note and note.strip():
+                model.update(note, category_id)
+        # A model capped at ``limit`` newest rows only covers the ids it read
+        model.low, model.high = (low if limit and rows >= limit else 0), high
+        return model
+
+    def _labelled(self, high):
+        return db.session.query(Transaction.id, Transaction.note, Transaction.category_id) \
+            .filter(Transaction.category_id.isnot(None), Transaction.note.isnot(None), Transaction.id <= high)
+
+    def _request(self, key):
+        """Queue training of the global model (``key`` None) or a user's model, at most once."""
+        with self._lock:
+            if key in self._requested:
+                return
+            self._requested.add(key)
+            if self._queue is None:
+                self._queue = socketio.server.eio.create_queue()
+                socketio.start_background_task(self._trainer, current_app._get_current_object())
+        self._queue.put(key)
+
+    def _trainer(self, app):
+        while True:
+            key = self._queue.get()
+            with app.app_context():
+                try:
+                    # Train on a fixed id range so later changes can tell whether the model counted a row
+                    high = db.session.query(func.max(Transaction.id)).scalar() or 0
+                    if key is None:
+                        recent = self._labelled(high).order_by(Transaction.id.desc()).limit(GLOBAL_TRAINING_ROWS)
+                        model = self._train(recent, high, GLOBAL_TRAINING_ROWS)
+                    else:
+                        model = self._train(self._labelled(high).filter(Transaction.user_id == key), high)
+                    with self._lock:
+                        if key is None:
+                            self._global = model
+                        else:
+                            self._users[key] = model
+                            while len(self._users) > MAX_USER_MODELS:
+                                self._users.popitem(last=False)
+                except Exception:
+                    app.logger.exception("Training category model %s failed", key or "global")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+                    with self._lock:
+                        self._requested.discard(key)
+
+    def prefetch(self, user_id):
+        """Queue training of the global model and ``user_id``'s model if they aren't loaded."""
+        user_id = int(user_id)
+        with self._lock:
+            need_global, need_user = self._global is None, user_id not in self._users
+        if need_global:
+            self._request(None)
+        if need_user:
+            self._request(user_id)
+
+    def suggest(self, user_id, note, limit=3):
+        """Up to ``limit`` ``(category_id, probability)`` pairs, most likely first.
+
+        Only models already in memory are used; missing ones are queued for
+        training and the answer is empty until at least one is ready.
+        """
+        feats = features(note)
+        if not feats:
+            return []
+        user_id = int(user_id)
+        # Predict under the lock so committed updates can't change the models mid-read
+        with self._lock:
+            user_model, global_model = self._users.get(user_id), self._global
+            if user_model is not None:
+                self._users.move_to_end(user_id)
+            user_probs = user_model.predict(feats) if user_model is not None else {}
+            global_probs = global_model.predict(feats) if global_model is not None else {}
+        if user_model is None or global_model is None:
+            self.prefetch(user_id)
+
+        if global_model is None:
+            weight = 1.0
+        else:
+            n = user_model.n if user_model is not None else 0
+            weight = n / (n + USER_WEIGHT_PRIOR)
+        blended = defaultdict(float)
+        for probs, w in ((user_probs, weight), (global_probs, 1 - weight)):
+            for category_id, p in probs.items():
+                blended[category_id] += w * p
+        return sorted(blended.items(), key=lambda item: -item[1])[:limit]
+
+    def observe(self, changes):
+        """Queue (before, after) ledger snapshots for the loaded models, applied after commit."""
+        updates = []
+        for before, after in changes:
+            if before is not None and after is not None and \
+                    (before["note"], before["category_id"]) == (after["note"], after["category_id"]):
+                continue
+            for snap, weight in ((before, -1), (after, 1)):
+                if snap is not None and snap["category_id"] is not None and snap["note"] and snap["note"].strip():
+                    updates.append((snap["user_id"], snap["id"], snap["note"], snap["category_id"], weight))
+        if updates:
+            event.listen(db.session(), "after_commit", lambda session: self._apply(updates), once=True)
+
+    def _apply(self, updates):
+        with self._lock:
+            for user_id, txn_id, note, category_id, weight in updates:
+                if user_id in self._users:
+                    self._users[user_id].apply(txn_id, note, category_id, weight)
+                if self._global is not None:
+                    self._global.apply(txn_id, note, category_id, weight)
+
+
+suggester = CategorySuggester()
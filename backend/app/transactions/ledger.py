@@ -0,0 +1,121 @@
+from collections import defaultdict
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, insert
+from .. import activity, percentiles
+from ..aggregates import increment
+from ..cache import response_cache
+from ..extensions import db
+from ..models import DailyStat, Transaction, UserCategoryTotal
+from .classifier import suggester
+
+UNCATEGORIZED = 0
+
+
+def snapshot(txn):
+    """Capture the fields of a transaction that feed the aggregates."""
+    return {
+        "id": txn.id,
+        "user_id": int(txn.user_id),
+        "category_id": txn.category_id,
+        "type": txn.type,
+        "amount": float(txn.amount),
+        "day": txn.timestamp.date(),
+        "note": txn.note,
+    }
+
+
+def apply_changes(changes):
+    """Fold (before, after) snapshot pairs into the aggregate tables.
+
+    ``before`` is None for an insert and ``after`` is None for a delete.
+    Must run inside the same DB transaction as the writes it describes.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    active = defaultdict(set)
+    for before, after in changes:
+        if after is not None and (before is None or before["day"] != after["day"]):
+            active[after["day"]].add(after["user_id"])
+        for snap, sign in ((before, -1), (after, 1)):
+            if snap is None:
+                continue
+            key = (snap["day"], snap["user_id"], snap["category_id"] or UNCATEGORIZED, snap["type"])
+            deltas[key][0] += sign * snap["amount"]
+            deltas[key][1] += sign
+
+    response_cache.bump_on_commit()
+
+    for day, user_ids in active.items():
+        activity.record(day, user_ids)
+    percentiles.record(changes)
+    suggester.observe(changes)
+
+    totals = defaultdict(lambda: [0.0, 0])
+    for (day, user_id, category_id, txn_type), (total, count) in deltas.items():
+        if count == 0 and total == 0:
+            continue
+        increment(
+            DailyStat,
+            {"day": day, "user_id": user_id, "category_id": category_id, "type": txn_type},
+            {"total": total, "count": count}
+        )
+        totals[(user_id, category_id, txn_type)][0] += total
+        totals[(user_id, category_id, txn_type)][1] += count
+
+    for (user_id, category_id, txn_type), (total, count) in totals.items():
+        if count == 0 and total == 0:
+            continue
+        increment(
+            UserCategoryTotal,
+            {"user_id": user_id, "category_id": category_id, "type": txn_type},
+            {"total": total, "count": count}
+        )
+
+
+def _totals_from_transactions():
+    return db.session.query(
+        Transaction.user_id,
+        func.coalesce(Transaction.category_id, UNCATEGORIZED),
+        Transaction.type,
+        func.sum(Transaction.amount),
+        func.count()
+    ).group_by(Transaction.user_id, Transaction.category_id, Transaction.type)
+
+
+totals_cli = AppGroup('totals', help="Maintain the user_category_totals aggregate table.")
+
+
+@totals_cli.command('rebuild')
+def rebuild_totals():
+    """Recompute user_category_totals from the transaction table."""
+    db.session.query(UserCategoryTotal).delete()
+    db.session.execute(insert(UserCategoryTotal).from_select(
+        ["user_id", "category_id", "type", "total", "count"],
+        _totals_from_transactions()
+    ))
+    db.session.commit()
+    click.echo(f"✅ Rebuilt {UserCategoryTotal.query.count()} total rows.")
+
+
+@totals_cli.command('check')
+@click.option('--tolerance', default=0.005, show_default=True, help="Allowed absolute drift on totals.")
+def check_totals(tolerance):
+    """Compare user_category_totals with a fresh aggregate and report drift."""
+    expected = {(u, c, t): (total, count) for u, c, t, total, count in _totals_from_transactions()}
+    stored = {
+        (r.user_id, r.category_id, r.type): (r.total, r.count)
+        for r in UserCategoryTotal.query.filter(UserCategoryTotal.count != 0)
+    }
+
+    drift = []
+    for key in expected.keys() | stored.keys():
+        want_total, want_count = expected.get(key, (0.0, 0))
+        have_total, have_count = stored.get(key, (0.0, 0))
+        if want_count != have_count or abs(want_total - have_total) > tolerance:
+            drift.append((key, (want_total, want_count), (have_total, have_count)))
+
+    for key, want, have in sorted(drift):
+        click.echo(f"⚠️ user={key[0]} category={key[1]} type={key[2]}: expected {want}, stored {have}")
+    if drift:
+        raise click.ClickException(f"{len(drift)} drifted rows; run 'flask totals rebuild'.")
+    click.echo("✅ user_category_totals matches the transaction table.")
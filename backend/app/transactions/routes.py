@@ -1,10 +1,68 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import Transaction, Category
-from ..extensions import db, socketio
+from sqlalchemy import and_, func, or_
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, timedelta
+import base64
+import csv
+import io
+import json
+import math
+import zlib
+from ..models import DailyStat, Transaction, User, UserCategoryTotal
+from ..extensions import db
+from ..realtime import outbox
+from ..categories import categories
+from . import ledger
+from .classifier import suggester
+from .serializers import transaction_query, serialize_row, serialize_rows, serialize_transaction
 
 txn_bp = Blueprint('txn', __name__, url_prefix='/transactions')
 
+
+def _as_int(value):
+    """``value`` as an int, accepting numeric strings; raises ValueError for anything else."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"expected an integer, got {value!r}")
+    return int(value)
+
+
+def _as_amount(value):
+    """``value`` as a finite float, accepting numeric strings; raises ValueError for anything else."""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"expected a number, got {value!r}")
+    amount = float(value)
+    if not math.isfinite(amount):
+        raise ValueError(f"expected a finite number, got {value!r}")
+    return amount
+
+
+# 🚫 A category deleted through another worker stays in this worker's registry for up to
+# CATEGORY_CACHE_TTL seconds, so a write can pass validation and then trip the foreign key
+@txn_bp.errorhandler(IntegrityError)
+def handle_integrity_error(error):
+    db.session.rollback()
+    categories.invalidate()
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise error
+    requested = [data.get("category_id")]
+    if isinstance(data.get("operations"), list):
+        requested += [op.get("category_id") for op in data["operations"] if isinstance(op, dict)]
+    unknown = set()
+    for value in requested:
+        try:
+            category_id = _as_int(value)
+        except ValueError:
+            continue
+        if categories.name(category_id) is None:
+            unknown.add(category_id)
+    if not unknown:
+        raise error
+    return jsonify({"message": f"Invalid category_id: {sorted(unknown)}"}), 400
+
+
 # ➕ Add Transaction
 @txn_bp.route('/add', methods=['POST'])
 @jwt_required()
@@ -19,37 +77,35 @@ def add_transaction():
     if data["type"] == "expense":
         if not data.get("category_id"):
             return jsonify({"message": "category_id is required for expenses"}), 400
-        category = Category.query.get(data["category_id"])
-        if not category:
+        try:
+            category_id = _as_int(data["category_id"])
+        except ValueError:
+            return jsonify({"message": "Invalid category_id"}), 400
+        if categories.name(category_id) is None:
             return jsonify({"message": "Invalid category_id"}), 400
     else:
-        category = Category.query.filter_by(name="Salary").first()
+        category_id = categories.id_for("Salary")
 
     transaction = Transaction(
         amount=data["amount"],
         type=data["type"],
         note=data.get("note"),
         user_id=user_id,
-        category_id=category.id if category else None
+        category_id=category_id
     )
 
     db.session.add(transaction)
-    db.session.commit()
-
-    socketio.emit('transaction_update', {
+    db.session.flush()
+    ledger.apply_changes([(None, ledger.snapshot(transaction))])
+    payload = serialize_transaction(transaction)
+    outbox.enqueue(user_id, 'transaction_update', {
         "event": "added",
         "user_id": user_id,
-        "transaction": {
-            "id": transaction.id,
-            "amount": transaction.amount,
-            "type": transaction.type,
-            "category": {"id": category.id, "name": category.name},
-            "note": transaction.note,
-            "timestamp": transaction.timestamp.isoformat()
-        }
+        "transaction": payload
     })
+    db.session.commit()
 
-    return jsonify({"message": "Transaction added", "id": transaction.id}), 201
+    return jsonify({"message": "Transaction added", "id": payload["id"]}), 201
 
 
 # ✏️ Edit Transaction
@@ -62,34 +118,29 @@ def edit_transaction(id):
         return jsonify({"message": "Transaction not found"}), 404
 
     data = request.get_json()
+    before = ledger.snapshot(transaction)
 
     if "category_id" in data:
-        category = Category.query.get(data["category_id"])
-        if not category:
+        try:
+            category_id = _as_int(data["category_id"])
+        except ValueError:
+            return jsonify({"message": "Invalid category_id"}), 400
+        if categories.name(category_id) is None:
             return jsonify({"message": "Invalid category_id"}), 400
-        transaction.category_id = category.id
+        transaction.category_id = category_id
 
     transaction.amount = data.get("amount", transaction.amount)
     transaction.type = data.get("type", transaction.type)
     transaction.note = data.get("note", transaction.note)
 
-    db.session.commit()
-
-    socketio.emit('transaction_update', {
+    ledger.apply_changes([(before, ledger.snapshot(transaction))])
+    payload = serialize_transaction(transaction)
+    outbox.enqueue(user_id, 'transaction_update', {
         "event": "edited",
         "user_id": user_id,
-        "transaction": {
-            "id": transaction.id,
-            "amount": transaction.amount,
-            "type": transaction.type,
-            "category": {
-                "id": transaction.category.id,
-                "name": transaction.category.name
-            },
-            "note": transaction.note,
-            "timestamp": transaction.timestamp.isoformat()
-        }
+        "transaction": payload
     })
+    db.session.commit()
 
     return jsonify({"message": "Transaction updated successfully"}), 200
 
@@ -104,35 +155,381 @@ def delete_transaction(id):
         return jsonify({"message": "Transaction not found"}), 404
 
     deleted_id = transaction.id
+    ledger.apply_changes([(ledger.snapshot(transaction), None)])
     db.session.delete(transaction)
-    db.session.commit()
-
-    socketio.emit('transaction_update', {
+    outbox.enqueue(user_id, 'transaction_update', {
         "event": "deleted",
         "user_id": user_id,
         "transaction": {"id": deleted_id}
     })
+    db.session.commit()
 
     return jsonify({"message": "Transaction deleted"}), 200
 
 
-# 📄 List All Transactions
+# 📦 Batch add/edit/delete in a single DB transaction
+BATCH_MAX_OPERATIONS = 500
+
+
+@txn_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def batch_transactions():
+    user_id = get_jwt_identity()
+    data = request.get_json() or {}
+    operations = data.get("operations")
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"message": "operations must be a non-empty list"}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({"message": f"At most {BATCH_MAX_OPERATIONS} operations per batch"}), 400
+
+    # Validate the shape of every operation before touching the database
+    target_ids = []
+    category_ids = set()
+    for index, op in enumerate(operations):
+        kind = op.get("op") if isinstance(op, dict) else None
+        if kind not in ("add", "edit", "delete"):
+            return jsonify({"message": f"Operation {index}: op must be add, edit or delete"}), 400
+        if op.get("type") is not None and op["type"] not in ("income", "expense"):
+            return jsonify({"message": f"Operation {index}: type must be 'income' or 'expense'"}), 400
+        if op.get("note") is not None and not isinstance(op["note"], str):
+            return jsonify({"message": f"Operation {index}: note must be a string"}), 400
+        # Coerce numeric fields up front so bad types answer 400 instead of failing mid-batch
+        try:
+            if op.get("amount") is not None:
+                op["amount"] = _as_amount(op["amount"])
+            if op.get("category_id") is not None:
+                op["category_id"] = _as_int(op["category_id"])
+        except ValueError as e:
+            return jsonify({"message": f"Operation {index}: {e}"}), 400
+
+        if kind == "add":
+            if not op.get("amount") or not op.get("type"):
+                return jsonify({"message": f"Operation {index}: amount and type are required"}), 400
+            if op["type"] == "expense" and not op.get("category_id"):
+                return jsonify({"message": f"Operation {index}: category_id is required for expenses"}), 400
+        else:
+            if not isinstance(op.get("id"), int):
+                return jsonify({"message": f"Operation {index}: id is required"}), 400
+            # Omitted fields keep their stored value; an explicit null would hit a NOT NULL column
+            nulls = [field for field in ("amount", "type") if field in op and op[field] is None]
+            if kind == "edit" and nulls:
+                return jsonify({"message": f"Operation {index}: {' and '.join(nulls)} cannot be null"}), 400
+            if op["id"] in target_ids:
+                return jsonify({"message": f"Operation {index}: transaction {op['id']} appears more than once"}), 400
+            target_ids.append(op["id"])
+
+        if kind != "delete" and op.get("category_id") is not None and (kind == "edit" or op["type"] == "expense"):
+            category_ids.add(op["category_id"])
+
+    # One query for every edited/deleted transaction, scoped to the caller
+    existing = {}
+    if target_ids:
+        existing = {t.id: t for t in Transaction.query.filter(
+            Transaction.user_id == user_id, Transaction.id.in_(target_ids)
+        ).all()}
+        missing = [i for i in target_ids if i not in existing]
+        if missing:
+            return jsonify({"message": f"Transaction not found: {missing}"}), 404
+
+    unknown = [cid for cid in category_ids if categories.name(cid) is None]
+    if unknown:
+        return jsonify({"message": f"Invalid category_id: {sorted(unknown)}"}), 400
+    salary_id = categories.id_for("Salary")
+
+    new_transactions = []
+    updates = []
+    deleted_ids = []
+    changes = []
+    ledger_changes = []
+    for op in operations:
+        if op["op"] == "add":
+            txn = Transaction(
+                amount=op["amount"],
+                type=op["type"],
+                note=op.get("note"),
+                user_id=user_id,
+                category_id=op["category_id"] if op["type"] == "expense" else salary_id
+            )
+            new_transactions.append(txn)
+            changes.append(("added", txn))
+        elif op["op"] == "edit":
+            txn = existing[op["id"]]
+            updates.append({
+                "id": txn.id,
+                "amount": op.get("amount", txn.amount),
+                "type": op.get("type", txn.type),
+                "note": op.get("note", txn.note),
+                "category_id": op["category_id"] if op.get("category_id") is not None else txn.category_id,
+            })
+            changes.append(("edited", updates[-1] | {"timestamp": txn.timestamp}))
+            ledger_changes.append((ledger.snapshot(txn), {
+                **ledger.snapshot(txn),
+                "category_id": updates[-1]["category_id"],
+                "type": updates[-1]["type"],
+                "amount": float(updates[-1]["amount"]),
+                "note": updates[-1]["note"]
+            }))
+        else:
+            deleted_ids.append(op["id"])
+            changes.append(("deleted", {"id": op["id"]}))
+            ledger_changes.append((ledger.snapshot(existing[op["id"]]), None))
+
+    if new_transactions:
+        db.session.add_all(new_transactions)
+    if updates:
+        db.session.bulk_update_mappings(Transaction, updates)
+    if deleted_ids:
+        Transaction.query.filter(
+            Transaction.user_id == user_id, Transaction.id.in_(deleted_ids)
+        ).delete(synchronize_session=False)
+    # Flush so inserted rows get their ids and timestamps for the aggregates and event payload
+    db.session.flush()
+    ledger.apply_changes(ledger_changes + [(None, ledger.snapshot(t)) for t in new_transactions])
+
+    events = []
+    for event, row in changes:
+        if event == "added":
+            row = serialize_transaction(row)
+        elif event == "edited":
+            row = serialize_row((
+                row["id"], row["amount"], row["type"], row["category_id"],
+                categories.name(row["category_id"]), row["note"], row["timestamp"]
+            ))
+        events.append({"event": event, "transaction": row})
+
+    outbox.enqueue(user_id, 'transaction_update', {
+        "event": "batch",
+        "user_id": user_id,
+        "changes": events
+    })
+    db.session.commit()
+
+    return jsonify({
+        "message": "Batch applied",
+        "added": [t.id for t in new_transactions],
+        "edited": len(updates),
+        "deleted": len(deleted_ids)
+    }), 200
+
+
+# 📄 List Transactions (keyset-paginated, newest first)
+LIST_DEFAULT_LIMIT = 50
+LIST_MAX_LIMIT = 200
+
+
+def _encode_cursor(timestamp, txn_id):
+    raw = f"{timestamp.isoformat()}|{txn_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    timestamp, txn_id = raw.rsplit("|", 1)
+    return datetime.fromisoformat(timestamp), int(txn_id)
+
+
+def _apply_filters(query, args):
+    """Narrow a Transaction query by the ?start, ?end, ?type and ?category_id filters.
+
+    Raises ValueError on malformed input so callers can answer with a 400.
+    """
+    if args.get("start"):
+        query = query.filter(Transaction.timestamp >= datetime.fromisoformat(args["start"]))
+    if args.get("end"):
+        end = datetime.fromisoformat(args["end"])
+        # A bare date means "through the end of that day"
+        if len(args["end"]) == 10:
+            end += timedelta(days=1)
+        query = query.filter(Transaction.timestamp < end)
+    if args.get("type"):
+        if args["type"] not in ("income", "expense"):
+            raise ValueError("type must be 'income' or 'expense'")
+        query = query.filter(Transaction.type == args["type"])
+    if args.get("category_id"):
+        query = query.filter(Transaction.category_id == int(args["category_id"]))
+    return query
+
+
 @txn_bp.route('/list', methods=['GET'])
 @jwt_required()
 def list_transactions():
     user_id = get_jwt_identity()
-    transactions = Transaction.query.filter_by(user_id=user_id).order_by(Transaction.timestamp.desc()).all()
-
-    result = [{
-        "id": t.id,
-        "amount": t.amount,
-        "type": t.type,
-        "category": {
-            "id": t.category.id,
-            "name": t.category.name
-        },
-        "note": t.note,
-        "timestamp": t.timestamp.isoformat()
-    } for t in transactions]
-
-    return jsonify(result), 200
+
+    try:
+        limit = min(int(request.args.get("limit", LIST_DEFAULT_LIMIT)), LIST_MAX_LIMIT)
+        query = _apply_filters(transaction_query(user_id), request.args)
+        if request.args.get("cursor"):
+            cursor_ts, cursor_id = _decode_cursor(request.args["cursor"])
+            # Spelled out rather than a row-value comparison, which MySQL won't turn into an index range scan
+            query = query.filter(or_(
+                Transaction.timestamp < cursor_ts,
+                and_(Transaction.timestamp == cursor_ts, Transaction.id < cursor_id)
+            ))
+    except ValueError as e:
+        return jsonify({"message": f"Invalid query parameters: {e}"}), 400
+
+    if limit < 1:
+        return jsonify({"message": "limit must be positive"}), 400
+
+    # Baseline for /transactions/sync and the socket 'sync' event. Read before the rows: a write
+    # landing in between is then replayed on top of a page that already has it (harmless),
+    # instead of being skipped by a client whose version is newer than its page.
+    version = db.session.query(User.event_version).filter(User.id == user_id).scalar()
+
+    # Fetch one extra row to learn whether another page exists
+    rows = query.order_by(Transaction.timestamp.desc(), Transaction.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = _encode_cursor(last.timestamp, last.id)
+
+    return jsonify({
+        "transactions": serialize_rows(rows),
+        "next_cursor": next_cursor,
+        "version": version
+    }), 200
+
+
+# 📤 Export Transactions as a streamed CSV / NDJSON download
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = ["id", "timestamp", "type", "amount", "category", "note"]
+
+
+def _export_chunks(rows, fmt):
+    """Yield the export body in chunks of EXPORT_BATCH_SIZE rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    for count, (txn_id, amount, txn_type, _, category, note, timestamp) in enumerate(rows, 1):
+        values = [txn_id, timestamp.isoformat(), txn_type, amount, category, note]
+        if fmt == "csv":
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False) + "\n")
+
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode()
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@txn_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_transactions():
+    user_id = get_jwt_identity()
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"message": "format must be 'csv' or 'ndjson'"}), 400
+    use_gzip = request.args.get("gzip", "").lower() in ("1", "true", "yes")
+
+    try:
+        query = _apply_filters(transaction_query(user_id), request.args)
+    except ValueError as e:
+        return jsonify({"message": f"Invalid query parameters: {e}"}), 400
+
+    # yield_per streams rows from a server-side cursor instead of buffering them all
+    rows = query.order_by(Transaction.timestamp.desc(), Transaction.id.desc()).yield_per(EXPORT_BATCH_SIZE)
+
+    body = _export_chunks(rows, fmt)
+    filename = f"transactions.{fmt}"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if use_gzip:
+        body = _gzip_chunks(body)
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# 📊 Balance and per-category totals, read from the incrementally maintained aggregate
+@txn_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def transaction_summary():
+    user_id = get_jwt_identity()
+
+    # ?start / ?end (inclusive dates) sum the daily rollup; without them the lifetime totals answer
+    if request.args.get("start") or request.args.get("end"):
+        try:
+            query = db.session.query(
+                DailyStat.category_id, DailyStat.type, func.sum(DailyStat.total), func.sum(DailyStat.count)
+            ).filter(DailyStat.user_id == user_id)
+            if request.args.get("start"):
+                query = query.filter(DailyStat.day >= date.fromisoformat(request.args["start"][:10]))
+            if request.args.get("end"):
+                query = query.filter(DailyStat.day <= date.fromisoformat(request.args["end"][:10]))
+        except ValueError as e:
+            return jsonify({"message": f"Invalid query parameters: {e}"}), 400
+        rows = [row for row in query.group_by(DailyStat.category_id, DailyStat.type) if row[3]]
+    else:
+        rows = db.session.query(
+            UserCategoryTotal.category_id, UserCategoryTotal.type, UserCategoryTotal.total, UserCategoryTotal.count
+        ).filter(UserCategoryTotal.user_id == user_id, UserCategoryTotal.count > 0).all()
+
+    income = sum(total for _, txn_type, total, _ in rows if txn_type == "income")
+    expense = sum(total for _, txn_type, total, _ in rows if txn_type == "expense")
+
+    return jsonify({
+        "balance": income - expense,
+        "income": income,
+        "expense": expense,
+        "categories": [{
+            "category": categories.payload(category_id),
+            "type": txn_type,
+            "total": total,
+            "count": count
+        } for category_id, txn_type, total, count in rows]
+    }), 200
+
+
+# 🔁 Events missed since a given version (same as the socket 'sync' event)
+@txn_bp.route('/sync', methods=['GET'])
+@jwt_required()
+def sync_transactions():
+    user_id = get_jwt_identity()
+    try:
+        since = int(request.args.get("since", 0))
+    except ValueError:
+        return jsonify({"message": "since must be an integer"}), 400
+    return jsonify(outbox.replay(user_id, since)), 200
+
+
+# 🏷️ Suggest categories for a note as the user types
+@txn_bp.route('/suggest-category', methods=['GET'])
+@jwt_required()
+def suggest_category():
+    note = request.args.get("note", "").strip()
+    try:
+        limit = min(int(request.args.get("limit", 3)), 10)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    if not note:
+        return jsonify({"suggestions": []}), 200
+
+    suggestions = [
+        {"category": categories.payload(category_id), "confidence": round(probability, 4)}
+        for category_id, probability in suggester.suggest(get_jwt_identity(), note, limit + 2)
+        # Skip categories deleted since the model learned them
+        if categories.name(category_id) is not None
+    ]
+    return jsonify({"suggestions": suggestions[:limit]}), 200
@@ -0,0 +1,49 @@
+from ..categories import categories
+from ..extensions import db
+from ..models import Transaction, Category
+
+# Column order of every row produced by transaction_query()
+COLUMNS = (
+    Transaction.id,
+    Transaction.amount,
+    Transaction.type,
+    Transaction.category_id,
+    Category.name,
+    Transaction.note,
+    Transaction.timestamp,
+)
+
+
+def transaction_query(user_id):
+    """Column-only query for a user's transactions joined to their category name.
+
+    Rows come back as plain tuples, so no ORM instances are hydrated and no
+    lazy ``t.category`` loads are issued.
+    """
+    return db.session.query(*COLUMNS) \
+        .outerjoin(Category, Transaction.category_id == Category.id) \
+        .filter(Transaction.user_id == user_id)
+
+
+def serialize_row(row):
+    txn_id, amount, txn_type, category_id, category_name, note, timestamp = row
+    return {
+        "id": txn_id,
+        "amount": amount,
+        "type": txn_type,
+        "category": {"id": category_id, "name": category_name} if category_name is not None else None,
+        "note": note,
+        "timestamp": timestamp.isoformat()
+    }
+
+
+def serialize_rows(rows):
+    return [serialize_row(row) for row in rows]
+
+
+def serialize_transaction(txn):
+    """Serialize an in-session Transaction (e.g. right after a write) without touching its relationships."""
+    return serialize_row((
+        txn.id, txn.amount, txn.type, txn.category_id,
+        categories.name(txn.category_id), txn.note, txn.timestamp
+    ))
@@ -1,16 +1,16 @@
 from flask import Blueprint, jsonify,request
 from flask_jwt_extended import jwt_required,get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
-from ..models import Category,User
+from ..models import User
 from ..extensions import db
+from ..categories import categories
 
 user_bp = Blueprint('user', __name__, url_prefix='/user')
 
 @user_bp.route('/categories', methods=['GET'])
 @jwt_required()
 def get_categories():
-    categories = Category.query.all()
-    return jsonify([{"id": c.id, "name": c.name} for c in categories])
+    return jsonify(categories.all())
 
 
 @user_bp.route('/user-details')
@@ -0,0 +1,113 @@
+"""Benchmark: ORM hydration vs. column projection for transaction lists.
+
+Builds a throwaway SQLite database with one user and ``--rows``
+transactions spread over a handful of categories, then times the old
+``/transactions/list`` serialization (full ``Transaction`` instances plus
+lazy ``t.category`` loads) against ``transaction_query`` +
+``serialize_rows``. Both produce the same JSON-ready dicts; the script
+checks that before reporting.
+
+    cd backend
+    python benchmarks/serialize_transactions.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--categories", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; the best is reported.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="finlogix-bench-")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "JWT_SECRET_KEY": "benchmark",
+        "SECRET_KEY": "benchmark",
+    })
+
+    from sqlalchemy import event, insert
+    from app import create_app
+    from app.extensions import db
+    from app.models import Category, Transaction, User
+    from app.transactions.serializers import serialize_rows, transaction_query
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        category_ids = []
+        for i in range(args.categories):
+            category = Category(name=f"Category {i}")
+            db.session.add(category)
+            db.session.flush()
+            category_ids.append(category.id)
+        user = User(email="bench@example.com", password="x")
+        db.session.add(user)
+        db.session.flush()
+        start = datetime(2020, 1, 1)
+        db.session.execute(insert(Transaction), [{
+            "user_id": user.id,
+            "amount": float(i % 5000) + 0.5,
+            "type": "expense" if i % 4 else "income",
+            "category_id": category_ids[i % len(category_ids)],
+            "note": f"note {i % 97}",
+            "timestamp": start + timedelta(minutes=i),
+        } for i in range(args.rows)])
+        db.session.commit()
+        user_id = user.id
+
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(1))
+
+        def hydrated():
+            transactions = Transaction.query.filter_by(user_id=user_id) \
+                .order_by(Transaction.timestamp.desc(), Transaction.id.desc()).all()
+            return [{
+                "id": t.id,
+                "amount": t.amount,
+                "type": t.type,
+                "category": {"id": t.category.id, "name": t.category.name},
+                "note": t.note,
+                "timestamp": t.timestamp.isoformat()
+            } for t in transactions]
+
+        def projected():
+            return serialize_rows(transaction_query(user_id)
+                                  .order_by(Transaction.timestamp.desc(), Transaction.id.desc()).all())
+
+        results = {}
+        for name, fn in (("ORM hydration + lazy category", hydrated), ("column projection", projected)):
+            best, queries = float("inf"), 0
+            for _ in range(args.repeat):
+                db.session.remove()  # empty identity map, as in a fresh request
+                statements.clear()
+                began = time.perf_counter()
+                output = fn()
+                best = min(best, time.perf_counter() - began)
+                queries = len(statements)
+            results[name] = (best, queries, output)
+
+        (old_name, (old_time, old_queries, old_output)), (new_name, (new_time, new_queries, new_output)) = results.items()
+        if old_output != new_output:
+            raise SystemExit("❌ The two serializers disagree")
+
+        print(f"{args.rows} transactions, {args.categories} categories, best of {args.repeat}")
+        print(f"  {old_name:<30} {old_time * 1000:8.1f} ms  {old_queries} queries")
+        print(f"  {new_name:<30} {new_time * 1000:8.1f} ms  {new_queries} queries")
+        print(f"  speedup: {old_time / new_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
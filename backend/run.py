@@ -1,4 +1,13 @@
 import os
+
+# Serve through eventlet unless told otherwise, as this entry point did before the
+# async mode was pinned. eventlet has to patch the standard library before anything
+# else imports it.
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "eventlet")
+if os.environ["SOCKETIO_ASYNC_MODE"] == "eventlet":
+    import eventlet
+    eventlet.monkey_patch()
+
 from app import create_app
 from app.extensions import socketio
 
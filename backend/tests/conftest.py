@@ -0,0 +1,111 @@
+import os
+import tempfile
+import threading
+import time
+import pytest
+
+# Config reads the environment at import time, so point it at throwaway storage first
+_workdir = tempfile.mkdtemp(prefix="finlogix-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_workdir, 'test.db')}",
+    "JWT_SECRET_KEY": "test-jwt-secret-key-with-enough-bytes",
+    "SECRET_KEY": "test-secret",
+    "LLM_BACKEND": "stub",
+    "LLM_STUB_LATENCY": "0",
+    "JOB_STORE_DIR": os.path.join(_workdir, "jobs"),
+    "ADVICE_CACHE_PATH": os.path.join(_workdir, "advice.sqlite3"),
+})
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app import create_app  # noqa: E402
+from app.extensions import db as _db, socketio  # noqa: E402
+from app.models import Category, User  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["OUTBOX_POLL_INTERVAL"] = 0.05
+    with app.app_context():
+        _db.create_all()
+        _db.session.add_all([Category(name=name) for name in ("Food", "Rent", "Travel", "Utilities", "Salary")])
+        _db.session.commit()
+        yield app
+
+
+@pytest.fixture
+def db(app):
+    yield _db
+    _db.session.rollback()
+    _db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user and return ``(user, auth headers)``."""
+    count = [0]
+
+    def make(role="user"):
+        count[0] += 1
+        user = User(email=f"{role}{count[0]}-{os.urandom(4).hex()}@example.com", password="x", role=role)
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id), additional_claims={"role": role})
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return make
+
+
+@pytest.fixture
+def count_queries(db):
+    """Context manager collecting the SQL statements the calling thread runs inside it.
+
+    Statements from background tasks (e.g. the outbox dispatcher) are ignored.
+    """
+    class Counter:
+        def __enter__(self):
+            self.statements = []
+            self._thread = threading.get_ident()
+            event.listen(db.engine, "before_cursor_execute", self._record)
+            return self
+
+        def __exit__(self, *exc):
+            event.remove(db.engine, "before_cursor_execute", self._record)
+
+        def _record(self, conn, cursor, statement, *args):
+            if threading.get_ident() == self._thread:
+                self.statements.append(statement)
+
+    return Counter
+
+
+@pytest.fixture
+def socket_for(app):
+    """Open a Socket.IO test client authenticated with the given auth headers."""
+    clients = []
+
+    def connect(headers):
+        clients.append(socketio.test_client(app, auth={"token": headers["Authorization"][7:]}))
+        return clients[-1]
+
+    yield connect
+    for socket_client in clients:
+        if socket_client.is_connected():
+            socket_client.disconnect()
+
+
+def received(socket_client, name, timeout=5):
+    """Wait up to ``timeout`` seconds for ``name`` events and return them."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        events = [e for e in socket_client.get_received() if e["name"] == name]
+        if events:
+            return events
+        socketio.sleep(0.02)
+    return []
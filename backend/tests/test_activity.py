@@ -0,0 +1,28 @@
+from datetime import date
+from app import activity
+from app.models import ActivityDelta
+
+
+def test_first_transaction_of_the_day_does_not_write_the_shared_sketch(client, make_user, count_queries):
+    _, headers = make_user()
+    with count_queries() as queries:
+        response = client.post("/transactions/add", json={"amount": 20, "type": "expense", "category_id": 2},
+                               headers=headers)
+
+    assert response.status_code == 201
+    assert not [s for s in queries.statements
+                if s.startswith(("INSERT INTO daily_activity_sketch", "UPDATE daily_activity_sketch"))]
+    assert len([s for s in queries.statements if s.startswith("INSERT INTO activity_delta")]) == 1
+
+
+def test_compaction_preserves_active_users(client, make_user):
+    for _ in range(3):
+        _, headers = make_user()
+        client.post("/transactions/add", json={"amount": 20, "type": "expense", "category_id": 2}, headers=headers)
+
+    today = date.today()
+    before = activity.active_users(today, today)
+    while activity.compact():
+        pass
+    assert ActivityDelta.query.count() == 0
+    assert activity.active_users(today, today) == before >= 3
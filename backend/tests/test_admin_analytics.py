@@ -0,0 +1,88 @@
+from datetime import date
+import pytest
+
+REPORTS = [
+    "/admin/user-summaries",
+    "/admin/overspenders?limit=0",
+    "/admin/categories/stats",
+    "/admin/categories/type-breakdown",
+]
+
+
+@pytest.fixture
+def spenders(client, make_user):
+    """Several users spending across several categories, so per-row lookups would show up as extra queries."""
+    users = [make_user() for _ in range(4)]
+    for n, (_, headers) in enumerate(users):
+        for category_id in (1, 2, 3):
+            response = client.post("/transactions/add", json={
+                "amount": 100 * (n + 1) + category_id, "type": "expense", "category_id": category_id
+            }, headers=headers)
+            assert response.status_code == 201
+        client.post("/transactions/add", json={"amount": 1000, "type": "income"}, headers=headers)
+    return users
+
+
+@pytest.mark.parametrize("path", REPORTS)
+@pytest.mark.parametrize("window", ["", f"start=2000-01-01&end={date.today().isoformat()}"])
+def test_admin_report_runs_one_query(client, make_user, spenders, count_queries, path, window):
+    _, admin_headers = make_user("admin")
+    url = f"{path}{'&' if '?' in path else '?'}{window}" if window else path
+
+    with count_queries() as queries:
+        response = client.get(url, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.json
+    assert len(queries.statements) == 1, queries.statements
+
+
+def test_user_summaries_pages_past_the_first(client, make_user, spenders):
+    _, admin_headers = make_user("admin")
+    seen = []
+    page = 1
+    while True:
+        rows = client.get(f"/admin/user-summaries?per_page=2&page={page}", headers=admin_headers).json
+        seen += [row["user_id"] for row in rows]
+        if len(rows) < 2:
+            break
+        page += 1
+
+    everyone = client.get("/admin/user-summaries?per_page=1000", headers=admin_headers).json
+    assert seen == [row["user_id"] for row in everyone]
+    assert {user.id for user, _ in spenders} <= set(seen)
+
+
+@pytest.mark.parametrize("report", ["user_summaries", "category_stats", "type_breakdown"])
+def test_report_export_streams_one_query(app, spenders, count_queries, report, monkeypatch):
+    import io
+    from app.admin import analytics, reports
+
+    monkeypatch.setattr(analytics, "STREAM_BATCH_SIZE", 2)  # several fetches from the same cursor
+    out = io.StringIO()
+    with count_queries() as queries:
+        result = reports.run({"report": report, "format": "ndjson"}, out)
+
+    lines = out.getvalue().splitlines()
+    assert result["rows"] == len(lines) >= 3
+    assert len(queries.statements) == 1, queries.statements
+
+
+@pytest.mark.parametrize("periods", ["367", "1000000", "10000000000"])
+def test_trends_rejects_too_many_periods(client, make_user, periods):
+    _, admin_headers = make_user("admin")
+    response = client.get(f"/admin/analytics-trends?periods={periods}", headers=admin_headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("body", [
+    {"report": "category_stats", "sort": "email"},
+    {"report": "user_summaries", "order": "sideways"},
+    {"report": "type_breakdown", "start": 20260101},
+    {"report": "type_breakdown", "end": ["2026-01-01"]},
+    {"report": ["user_summaries"]},
+])
+def test_report_request_is_validated_up_front(client, make_user, body):
+    _, admin_headers = make_user("admin")
+    response = client.post("/admin/reports", json=body, headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+from conftest import received
+from app.ai.advice import advice_jobs
+from app.extensions import socketio
+
+
+def test_advice_job_runs_on_async_mode_workers(client, make_user, socket_for):
+    _, headers = make_user()
+    client.post("/transactions/add", json={"amount": 400, "type": "expense", "category_id": 1}, headers=headers)
+    socket_client = socket_for(headers)
+
+    response = client.post("/ai/advice", headers=headers)
+    assert response.status_code == 202
+    job_id = response.json["id"]
+    # Workers pull from a queue built by the Socket.IO server for its async mode
+    assert type(advice_jobs._queue) is type(socketio.server.eio.create_queue())
+
+    events = received(socket_client, "advice_ready")
+    assert [e["args"][0]["id"] for e in events] == [job_id]
+    job = events[0]["args"][0]
+    assert job["status"] == "done"
+    assert job["result"]["advice"]
+
+    status = client.get(f"/ai/advice/jobs/{job_id}", headers=headers)
+    assert status.json["status"] == "done"
+
+
+def test_sync_advice_answers_before_a_slow_model(client, make_user, socket_for, monkeypatch):
+    import time
+    from app.ai.llm import get_client
+
+    monkeypatch.setattr(get_client(), "latency", 1.0)
+    _, headers = make_user()
+    client.post("/transactions/add", json={"amount": 75, "type": "expense", "category_id": 2}, headers=headers)
+    socket_client = socket_for(headers)
+
+    began = time.monotonic()
+    first = client.get("/ai/advice", headers=headers).json
+    assert time.monotonic() - began < 0.5
+    assert first["source"] == "insights" and first["advice"] and first["job_id"]
+
+    # The model's answer lands in the background and is served from the cache afterwards
+    assert received(socket_client, "advice_ready")
+    second = client.get("/ai/advice", headers=headers).json
+    assert second == {"advice": second["advice"], "cached": True, "source": "model", "job_id": None}
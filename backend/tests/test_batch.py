@@ -0,0 +1,45 @@
+from app.models import Transaction
+
+
+def _add(client, headers, amount=10, note="coffee"):
+    response = client.post("/transactions/add", json={"amount": amount, "type": "expense", "category_id": 1,
+                                                      "note": note}, headers=headers)
+    return response.json["id"]
+
+
+def test_edit_with_null_amount_or_type_is_rejected(db, client, make_user):
+    _, headers = make_user()
+    txn_id = _add(client, headers)
+
+    for field in ("amount", "type"):
+        response = client.post("/transactions/batch", json={"operations": [
+            {"op": "edit", "id": txn_id, "note": "tea"},
+            {"op": "edit", "id": _add(client, headers), field: None},
+        ]}, headers=headers)
+        assert response.status_code == 400
+        assert response.json["message"] == f"Operation 1: {field} cannot be null"
+
+    assert db.session.get(Transaction, txn_id).note == "coffee"
+
+
+def test_batch_is_atomic(db, client, make_user):
+    user, headers = make_user()
+    kept, deleted = _add(client, headers, 10), _add(client, headers, 20)
+
+    response = client.post("/transactions/batch", json={"operations": [
+        {"op": "add", "amount": 5, "type": "expense", "category_id": 1},
+        {"op": "delete", "id": deleted},
+        {"op": "edit", "id": kept, "category_id": 999},
+    ]}, headers=headers)
+    assert response.status_code == 400
+    assert Transaction.query.filter_by(user_id=user.id).count() == 2
+
+    response = client.post("/transactions/batch", json={"operations": [
+        {"op": "add", "amount": "5", "type": "expense", "category_id": "1", "note": "bus"},
+        {"op": "delete", "id": deleted},
+        {"op": "edit", "id": kept, "amount": 15},
+    ]}, headers=headers)
+    assert response.status_code == 200
+    db.session.expire_all()
+    rows = {t.note: float(t.amount) for t in Transaction.query.filter_by(user_id=user.id)}
+    assert rows == {"coffee": 15.0, "bus": 5.0}
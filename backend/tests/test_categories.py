@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import event
+from app.categories import categories
+from app.models import Category
+
+
+@pytest.fixture
+def foreign_keys(db):
+    """Enforce foreign keys on SQLite the way MySQL does, for connections checked out inside the test."""
+    def enable(dbapi_connection, *args):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    event.listen(db.engine, "checkout", enable)
+    yield
+    event.remove(db.engine, "checkout", enable)
+    db.session.remove()
+    db.engine.dispose()
+
+
+@pytest.mark.parametrize("write", ["add", "batch"])
+def test_category_deleted_by_another_worker_answers_400(db, client, make_user, foreign_keys, write):
+    _, headers = make_user()
+    category = Category(name=f"Short-lived {write}")
+    db.session.add(category)
+    db.session.commit()
+    category_id = category.id
+    categories.invalidate()
+    assert categories.name(category_id) is not None
+
+    # Deleted behind this worker's back: its registry still vouches for the id
+    db.session.delete(category)
+    db.session.commit()
+
+    body = {"amount": 10, "type": "expense", "category_id": category_id}
+    if write == "add":
+        response = client.post("/transactions/add", json=body, headers=headers)
+    else:
+        response = client.post("/transactions/batch", json={"operations": [{"op": "add", **body}]}, headers=headers)
+    assert response.status_code == 400
+    assert response.json["message"] == f"Invalid category_id: [{category_id}]"
+    assert categories.name(category_id) is None
@@ -0,0 +1,40 @@
+import time
+from app.transactions.classifier import CategorySuggester, NaiveBayes, features
+
+
+def test_suggest_never_trains_on_the_request_path(app, client, make_user, count_queries):
+    user, headers = make_user()
+    for note, category_id in [("uber trip home", 3)] * 3 + [("grocery store run", 2)] * 3:
+        client.post("/transactions/add", json={"amount": 10, "type": "expense", "category_id": category_id,
+                                               "note": note}, headers=headers)
+    user_id, suggester = user.id, CategorySuggester()
+
+    with count_queries() as queries:
+        assert suggester.suggest(user_id, "uber ride") == []
+    assert queries.statements == []
+
+    deadline = time.monotonic() + 5
+    while not suggester.suggest(user_id, "uber ride") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with count_queries() as queries:
+        suggestions = suggester.suggest(user_id, "uber ride")
+    assert queries.statements == []
+    assert suggestions[0][0] == 3
+
+
+def test_removing_unseen_notes_keeps_models_usable():
+    model = NaiveBayes()
+    model.low, model.high = 10, 20
+    model.apply(12, "uber trip home", 3, 1)
+    model.apply(5, "grocery store run", 2, -1)  # older than the training window
+    model.apply(25, "grocery store run", 2, -1)  # committed after training and never added
+    assert list(model.predict(features("grocery"))) == [3]
+
+    model.update("uber trip home", 3, -1)
+    model.update("uber trip home", 3, -1)
+    assert model.n == 0 and model.predict(features("uber ride")) == {}
+
+    model.apply(30, "grocery store run", 2, 1)
+    model.apply(12, "uber trip", 3, 1)
+    assert set(model.predict(features("uber ride"))) == {2, 3}
+    assert all(count >= 0 for counts in model.counts.values() for count in counts.values())
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app.models import Transaction
+
+
+def test_cursor_pages_cover_shared_timestamps_once(db, client, make_user):
+    user, headers = make_user()
+    same = datetime(2026, 1, 5, 12, 0)
+    db.session.add_all([Transaction(amount=i + 1, type="expense", category_id=1, user_id=user.id,
+                                    timestamp=same if i % 2 else datetime(2026, 1, 1 + i, 9, 0)) for i in range(7)])
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/transactions/list", query_string={"limit": 2, **({"cursor": cursor} if cursor else {})},
+                              headers=headers)
+        seen += [t["id"] for t in response.json["transactions"]]
+        cursor = response.json["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = [t.id for t in Transaction.query.filter_by(user_id=user.id)
+                .order_by(Transaction.timestamp.desc(), Transaction.id.desc())]
+    assert seen == expected
@@ -0,0 +1,41 @@
+from conftest import received
+from app.extensions import socketio
+from app.models import OutboxEvent
+from app.realtime.outbox import dispatcher
+
+
+def test_dispatcher_runs_under_configured_async_mode(app, db, client, make_user, socket_for):
+    assert socketio.async_mode == app.config["SOCKETIO_ASYNC_MODE"]
+
+    user, headers = make_user()
+    socket_client = socket_for(headers)
+    assert socket_client.is_connected()
+    # The wake-up event comes from the server's async driver, not the threading module
+    assert type(dispatcher._wake) is type(socketio.server.eio.create_event())
+
+    response = client.post("/transactions/add", json={"amount": 250, "type": "expense", "category_id": 1},
+                           headers=headers)
+    assert response.status_code == 201
+
+    events = received(socket_client, "transaction_update")
+    assert len(events) == 1
+    payload = events[0]["args"][0]
+    assert payload["event"] == "added"
+    assert payload["transaction"]["id"] == response.json["id"]
+    assert payload["version"] == 1
+
+    db.session.expire_all()
+    assert OutboxEvent.query.filter_by(user_id=user.id, delivered_at=None).count() == 0
+
+
+def test_dispatcher_picks_up_events_left_undelivered(app, db, make_user, socket_for):
+    user, headers = make_user()
+    socket_client = socket_for(headers)
+
+    # As if a previous process committed the event and died before delivering it: no wake-up
+    db.session.add(OutboxEvent(user_id=user.id, version=1, event="transaction_update",
+                               payload='{"event": "deleted", "transaction": {"id": 1}, "version": 1}'))
+    db.session.commit()
+
+    events = received(socket_client, "transaction_update")
+    assert [e["args"][0]["version"] for e in events] == [1]
@@ -0,0 +1,36 @@
+from app import percentiles
+from app.models import CategorySketchDelta
+
+
+def test_expense_write_does_not_touch_shared_sketch_rows(client, make_user, count_queries):
+    _, headers = make_user()
+    client.post("/transactions/add", json={"amount": 10, "type": "expense", "category_id": 2}, headers=headers)
+
+    with count_queries() as queries:
+        response = client.post("/transactions/add", json={"amount": 20, "type": "expense", "category_id": 2},
+                               headers=headers)
+
+    assert response.status_code == 201
+    assert not [s for s in queries.statements if "daily_category_sketch" in s]
+    assert len([s for s in queries.statements if s.startswith("INSERT INTO category_sketch_delta")]) == 1
+
+
+def test_compaction_preserves_percentiles(app, db, client, make_user):
+    _, headers = make_user()
+    ids = []
+    for amount in (120, 80, 300, 45, 999, 60):
+        response = client.post("/transactions/add", json={"amount": amount, "type": "expense", "category_id": 3},
+                               headers=headers)
+        ids.append(response.json["id"])
+    client.put(f"/transactions/edit/{ids[0]}", json={"amount": 150}, headers=headers)
+    client.delete(f"/transactions/delete/{ids[1]}", headers=headers)
+
+    def snapshot():
+        sketch = percentiles.category_percentiles()[3]
+        return sketch.count, [sketch.quantile(q) for q in (0.1, 0.5, 0.9)]
+
+    before = snapshot()
+    while percentiles.compact():
+        pass
+    assert CategorySketchDelta.query.count() == 0
+    assert snapshot() == before
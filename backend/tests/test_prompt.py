@@ -0,0 +1,9 @@
+from datetime import date
+from app.ai.prompt import MONTHS, first_of_month
+
+
+def test_monthly_window_covers_exactly_months():
+    assert first_of_month(date(2026, 10, 18), MONTHS - 1) == date(2026, 5, 1)
+    assert first_of_month(date(2026, 3, 31), MONTHS - 1) == date(2025, 10, 1)
+    assert first_of_month(date(2026, 1, 1)) == date(2026, 1, 1)
+    assert first_of_month(date(2026, 1, 15), 12) == date(2025, 1, 1)
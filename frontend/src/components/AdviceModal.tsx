@@ -23,10 +23,22 @@ const AdviceModal: React.FC<AdviceModalProps> = ({ isOpen, onClose }) => {
     setAdvice(null);
     setLoading(true);
     try {
-      const res = await API.get('/ai/advice');
-      setAdvice(res.data.advice);
+      let res = await API.post('/ai/advice');
+      // 202: show the instant local insights, then poll the model's job until it finishes
+      if (res.data.preview) setAdvice(res.data.preview);
+      for (let attempt = 0; res.data.status === 'queued' || res.data.status === 'running'; attempt++) {
+        if (attempt >= 60) throw new Error('Timed out');
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        res = await API.get(`/ai/advice/jobs/${res.data.id}`);
+      }
+      if (res.data.status !== 'done') throw new Error(res.data.error);
+      setAdvice(res.data.result.advice);
     } catch (err: any) {
-      toast.error('Failed to fetch AI advice.');
+      // Keep the preview if there is one; only a blank modal is worth an error
+      setAdvice(prev => {
+        if (!prev) toast.error('Failed to fetch AI advice.');
+        return prev;
+      });
     } finally {
       setLoading(false);
     }
@@ -59,12 +71,17 @@ const AdviceModal: React.FC<AdviceModalProps> = ({ isOpen, onClose }) => {
               <h2 className="text-xl font-semibold">Smart Budgeting Tips</h2>
             </div>
 
-            {loading ? (
+            {loading && !advice ? (
               <div className="text-center py-6 text-blue-500 font-medium animate-pulse">
                 Fetching personalized advice from Gemini AI...
               </div>
             ) : advice ? (
               <div className="space-y-2 text-gray-700 dark:text-gray-200 max-h-80 overflow-y-auto">
+                {loading && (
+                  <div className="text-sm text-blue-500 animate-pulse mb-2">
+                    Quick tips below, personalized advice from Gemini AI is on its way...
+                  </div>
+                )}
                 {advice.split('\n').map((line, index) => (
                   line.trim() ? (
                     <div key={index} className="flex gap-2 items-start">
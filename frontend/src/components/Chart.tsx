@@ -1,4 +1,4 @@
-import React, { useRef, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { Bar, Pie } from 'react-chartjs-2';
 import {
   Chart as ChartJS,
@@ -16,57 +16,60 @@ import type { ChartOptions } from 'chart.js';
 import toast from 'react-hot-toast';
 import html2canvas from 'html2canvas';
 import jsPDF from 'jspdf';
+import API from '../services/axiosInstance';
 
 ChartJS.register(ArcElement, BarElement, CategoryScale, LinearScale, Tooltip, Legend, ChartDataLabels);
 
-interface Transaction {
-  amount: number;
-  category: string | { name: string };
+interface SummaryRow {
+  category: { id: number; name: string } | null;
   type: 'income' | 'expense';
-  timestamp: string;
+  total: number;
 }
 
 interface ChartProps {
-  data: Transaction[];
+  refreshKey?: number;
 }
 
-const Chart: React.FC<ChartProps> = ({ data }) => {
+const Chart: React.FC<ChartProps> = ({ refreshKey }) => {
   const [filter, setFilter] = useState<'all' | 'income' | 'expense'>('all');
   const [timeFilter, setTimeFilter] = useState<'month' | 'week' | 'all' | 'custom'>('month');
   const [customStart, setCustomStart] = useState('');
   const [customEnd, setCustomEnd] = useState('');
   const [showDropdown, setShowDropdown] = useState(false);
+  const [summary, setSummary] = useState<SummaryRow[]>([]);
 
   const barRef = useRef<any>(null);
   const pieRef = useRef<any>(null);
   const chartContainerRef = useRef<HTMLDivElement>(null);
 
-  const now = dayjs();
-  const filteredData = data.filter(item => {
-    const txnDate = dayjs(item.timestamp);
-    const isTypeMatch = filter === 'all' || item.type === filter;
-
-    if (!isTypeMatch) return false;
-
+  // Per-category totals are summed on the server for the selected date range
+  useEffect(() => {
+    const now = dayjs();
+    let params: { start?: string; end?: string } = {};
     if (timeFilter === 'week') {
-      return txnDate.isAfter(now.subtract(7, 'day'));
+      params = { start: now.subtract(7, 'day').format('YYYY-MM-DD') };
     } else if (timeFilter === 'month') {
-      return txnDate.month() === now.month() && txnDate.year() === now.year();
+      params = { start: now.startOf('month').format('YYYY-MM-DD') };
     } else if (timeFilter === 'custom') {
-      if (!customStart || !customEnd) return false;
-      const start = dayjs(customStart).startOf('day');
-      const end = dayjs(customEnd).endOf('day');
-      return txnDate.isAfter(start.subtract(1, 'second')) && txnDate.isBefore(end.add(1, 'second'));
-    } else {
-      return true;
+      if (!customStart || !customEnd) {
+        setSummary([]);
+        return;
+      }
+      params = { start: customStart, end: customEnd };
     }
-  });
+
+    API.get('/transactions/summary', { params })
+      .then(res => setSummary(res.data.categories))
+      .catch(() => toast.error('Failed to load chart data'));
+  }, [timeFilter, customStart, customEnd, refreshKey]);
 
   const totals: { [key: string]: number } = {};
-  filteredData.forEach(item => {
-    const category = typeof item.category === 'object' ? item.category.name : item.category;
-    totals[category] = (totals[category] || 0) + item.amount;
-  });
+  summary
+    .filter(row => filter === 'all' || row.type === filter)
+    .forEach(row => {
+      const category = row.category?.name || 'Uncategorized';
+      totals[category] = (totals[category] || 0) + row.total;
+    });
 
   const chartData = {
     labels: Object.keys(totals),
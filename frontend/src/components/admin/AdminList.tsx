@@ -10,15 +10,33 @@ interface AdminUser {
   email: string;
 }
 
+interface AdminPage {
+  users: AdminUser[];
+  next_cursor: string | null;
+  total: number;
+  total_capped: boolean;
+}
+
 const AdminList = () => {
   const [admins, setAdmins] = useState<AdminUser[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [total, setTotal] = useState('');
   const [loading, setLoading] = useState(true);
 
-  useEffect(() => {
-    API.get('/admin/list')
-      .then(res => setAdmins(res.data))
+  const fetchPage = (cursor: string | null) => {
+    setLoading(true);
+    API.get<AdminPage>('/admin/list', { params: cursor ? { cursor } : {} })
+      .then(res => {
+        setAdmins(prev => (cursor ? [...prev, ...res.data.users] : res.data.users));
+        setNextCursor(res.data.next_cursor);
+        setTotal(`${res.data.total}${res.data.total_capped ? '+' : ''}`);
+      })
       .catch(() => toast.error('Failed to fetch admin users'))
-      .finally(() => setLoading(false)); 
+      .finally(() => setLoading(false));
+  };
+
+  useEffect(() => {
+    fetchPage(null);
   }, []);
 
   return (
@@ -28,9 +46,11 @@ const AdminList = () => {
       transition={{ duration: 0.4 }}
       className="max-w-3xl mx-auto mt-6 space-y-4"
     >
-      <h2 className="text-2xl font-semibold text-[#2A2A2A] mb-4">Admin Users</h2>
+      <h2 className="text-2xl font-semibold text-[#2A2A2A] mb-4">
+        Admin Users {total && <span className="text-base text-gray-400">({total})</span>}
+      </h2>
 
-      {loading ? (
+      {loading && admins.length === 0 ? (
         <div className="text-center text-gray-500 py-10">Loading...</div>
       ) : admins.length === 0 ? (
         <div className="text-center text-gray-500 py-10">No admin users found.</div>
@@ -53,6 +73,16 @@ const AdminList = () => {
           </motion.div>
         ))
       )}
+
+      {nextCursor && (
+        <button
+          onClick={() => fetchPage(nextCursor)}
+          disabled={loading}
+          className="w-full py-2 text-sm text-indigo-600 hover:text-indigo-800"
+        >
+          {loading ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </motion.div>
   );
 };
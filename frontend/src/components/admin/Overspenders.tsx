@@ -10,14 +10,15 @@ interface Overspender {
 
 const OverspendersPanel = () => {
   const [limit, setLimit] = useState(10000);
+  const [windowDays, setWindowDays] = useState(30);
   const [data, setData] = useState<Overspender[]>([]);
   const [loading, setLoading] = useState(false);
 
   const fetchOverspenders = async () => {
     setLoading(true);
     try {
-      const res = await API.get(`/admin/overspenders?limit=${limit}`);
-      setData(res.data);
+      const res = await API.get('/admin/overspend', { params: { window: windowDays, limit } });
+      setData(res.data.flagged);
     } catch {
       toast.error('Failed to fetch overspenders');
     } finally {
@@ -27,7 +28,7 @@ const OverspendersPanel = () => {
 
   useEffect(() => {
     fetchOverspenders();
-  }, [limit]);
+  }, [limit, windowDays]);
 
   return (
     <div className="bg-white rounded-2xl shadow p-5 border mt-8 w-full max-w-4xl mx-auto">
@@ -51,6 +52,17 @@ const OverspendersPanel = () => {
           />
           <span className="text-gray-600 text-sm font-medium">₹</span>
         </div>
+        <select
+          value={windowDays}
+          onChange={(e) => setWindowDays(parseInt(e.target.value))}
+          className="border px-3 py-2 rounded-lg shadow-sm focus:ring-red-200 focus:border-red-300"
+        >
+          {[7, 30, 90].map((days) => (
+            <option key={days} value={days}>
+              in the last {days} days
+            </option>
+          ))}
+        </select>
       </div>
 
       {/* Table or Message */}
@@ -58,7 +70,7 @@ const OverspendersPanel = () => {
         <p className="text-gray-500 text-sm">Loading...</p>
       ) : data.length === 0 ? (
         <p className="text-gray-500 text-sm">
-          No overspenders found for ₹{limit.toLocaleString()} threshold.
+          No overspenders found for ₹{limit.toLocaleString()} threshold in the last {windowDays} days.
         </p>
       ) : (
         <div className="overflow-x-auto">
@@ -13,18 +13,26 @@ interface User {
 const PromoteUser = () => {
   const [email, setEmail] = useState('');
   const [user, setUser] = useState<User | null>(null);
+  const [matches, setMatches] = useState<User[]>([]);
   const [loading, setLoading] = useState(false);
 
   const searchUser = async () => {
     if (!email.trim()) return toast.warn('Enter email');
     setLoading(true);
     try {
-      const res = await API.get(`/user/by-email/${encodeURIComponent(email)}`);
-      setUser(res.data);
+      const res = await API.get('/admin/user-list', { params: { q: email.trim(), limit: 10 } });
+      const found: User[] = res.data.users;
+      const exact = found.find(u => u.email === email.trim().toLowerCase());
+      if (found.length === 0) {
+        toast.error('User not found');
+      }
+      setMatches(exact || found.length === 1 ? [] : found);
+      setUser(exact || (found.length === 1 ? found[0] : null));
     } catch (err: any) {
       const msg = err?.response?.data?.message || 'User not found';
       toast.error(msg);
       setUser(null);
+      setMatches([]);
     } finally {
       setLoading(false);
     }
@@ -75,6 +83,26 @@ const PromoteUser = () => {
         </button>
       </div>
 
+      {/* Prefix matches to pick from */}
+      {matches.length > 0 && (
+        <ul className="mb-4 border border-[#EAE7DC] rounded-xl bg-white divide-y divide-[#F0F0F0]">
+          {matches.map((m) => (
+            <li key={m.id}>
+              <button
+                onClick={() => {
+                  setUser(m);
+                  setEmail(m.email);
+                  setMatches([]);
+                }}
+                className="w-full text-left px-4 py-2 hover:bg-[#F5F4F2] text-[#1F1F1F]"
+              >
+                {m.email} <span className="text-xs text-gray-400">({m.role})</span>
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+
       {/* User info display */}
       {user && (
         <motion.div
@@ -10,16 +10,23 @@ interface Summary {
   total_spent: number;
 }
 
+const PER_PAGE = 100;
+
 const UserSummaries = () => {
   const [data, setData] = useState<Summary[]>([]);
+  const [page, setPage] = useState(1);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    API.get('/admin/user-summaries')
+    setLoading(true);
+    API.get('/admin/user-summaries', { params: { page, per_page: PER_PAGE } })
       .then((res) => setData(res.data))
       .catch(() => toast.error('Failed to load user summaries'))
       .finally(() => setLoading(false));
-  }, []);
+  }, [page]);
+
+  // A full page means there may be more users after it
+  const hasNext = data.length === PER_PAGE;
 
   return (
     <motion.div
@@ -35,7 +42,7 @@ const UserSummaries = () => {
       {loading ? (
         <p className="text-gray-500 italic">Loading...</p>
       ) : data.length === 0 ? (
-        <p className="text-gray-500 italic">No users found.</p>
+        <p className="text-gray-500 italic">{page > 1 ? 'No more users.' : 'No users found.'}</p>
       ) : (
         <div className="overflow-x-auto rounded-xl border border-[#EDEDED] bg-white">
           <table className="w-full text-sm text-left">
@@ -56,7 +63,7 @@ const UserSummaries = () => {
                   initial={{ opacity: 0 }}
                   animate={{ opacity: 1 }}
                 >
-                  <td className="p-3 text-[#2C2C2C] font-semibold">{index + 1}</td>
+                  <td className="p-3 text-[#2C2C2C] font-semibold">{(page - 1) * PER_PAGE + index + 1}</td>
                   <td className="p-3 text-[#1F1F1F] font-medium">{user.email}</td>
                   <td className="p-3 text-right text-[#5B3926] font-bold">
                     ₹{user.total_spent.toLocaleString()}
@@ -67,6 +74,26 @@ const UserSummaries = () => {
           </table>
         </div>
       )}
+
+      {(page > 1 || hasNext) && (
+        <div className="flex justify-between items-center mt-4 text-sm">
+          <button
+            onClick={() => setPage(p => p - 1)}
+            disabled={page === 1 || loading}
+            className="px-3 py-1 rounded bg-[#F7F6F3] border border-[#EDEDED] disabled:opacity-50"
+          >
+            ← Previous
+          </button>
+          <span className="text-gray-500">Page {page}</span>
+          <button
+            onClick={() => setPage(p => p + 1)}
+            disabled={!hasNext || loading}
+            className="px-3 py-1 rounded bg-[#F7F6F3] border border-[#EDEDED] disabled:opacity-50"
+          >
+            Next →
+          </button>
+        </div>
+      )}
     </motion.div>
   );
 };
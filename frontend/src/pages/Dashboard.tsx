@@ -16,11 +16,16 @@ import {
 } from 'react-icons/fa';
 import { toast } from 'react-toastify';
 import { motion, AnimatePresence } from 'framer-motion';
+import dayjs from 'dayjs';
+
+const PAGE_SIZE = 50;
 
 const Dashboard = () => {
   type TabType = 'income' | 'expense' | 'charts';
 
   const [transactions, setTransactions] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [chartVersion, setChartVersion] = useState(0);
   const [categories, setCategories] = useState<any[]>([]);
   const [editingTxn, setEditingTxn] = useState<any | null>(null);
   const [balance, setBalance] = useState(0);
@@ -36,10 +41,14 @@ const Dashboard = () => {
   const [isMobileSidebarOpen, setIsMobileSidebarOpen] = useState(false);
 
   useEffect(() => {
-    fetchData();
+    fetchSummary();
     fetchCategories();
   }, []);
 
+  useEffect(() => {
+    fetchTransactions();
+  }, [activeTab]);
+
   const fetchCategories = async () => {
     try {
       const res = await API.get('/user/categories');
@@ -49,39 +58,41 @@ const Dashboard = () => {
     }
   };
 
-  const fetchData = async () => {
-    try {
-      const res = await API.get('/transactions/list');
-      const data = res.data;
-      setTransactions(data);
-
-      let total = 0, income = 0, expenses = 0;
-      const currentMonth = new Date().getMonth();
-      const currentYear = new Date().getFullYear();
+  const fetchData = () => {
+    fetchTransactions();
+    fetchSummary();
+    setChartVersion(v => v + 1);
+  };
 
-      data.forEach((txn: any) => {
-        const txnDate = new Date(txn.timestamp);
-        if (txn.type === 'income') {
-          total += txn.amount;
-          if (txnDate.getMonth() === currentMonth && txnDate.getFullYear() === currentYear) {
-            income += txn.amount;
-          }
-        } else {
-          total -= txn.amount;
-          if (txnDate.getMonth() === currentMonth && txnDate.getFullYear() === currentYear) {
-            expenses += txn.amount;
-          }
-        }
+  // Only the first page for the current tab; older rows load on demand
+  const fetchTransactions = async (cursor: string | null = null) => {
+    if (activeTab === 'charts') return;
+    try {
+      const res = await API.get('/transactions/list', {
+        params: { limit: PAGE_SIZE, type: activeTab, ...(cursor ? { cursor } : {}) },
       });
-
-      setBalance(total);
-      setMonthlyIncome(income);
-      setMonthlyExpenses(expenses);
+      setTransactions(prev => (cursor ? [...prev, ...res.data.transactions] : res.data.transactions));
+      setNextCursor(res.data.next_cursor);
     } catch (err: any) {
       toast.error(err.response?.data?.message || 'Failed to load transactions');
     }
   };
 
+  // Metric cards come from the server-side totals, not from the transaction rows
+  const fetchSummary = async () => {
+    try {
+      const [lifetime, month] = await Promise.all([
+        API.get('/transactions/summary'),
+        API.get('/transactions/summary', { params: { start: dayjs().startOf('month').format('YYYY-MM-DD') } }),
+      ]);
+      setBalance(lifetime.data.balance);
+      setMonthlyIncome(month.data.income);
+      setMonthlyExpenses(month.data.expense);
+    } catch (err: any) {
+      toast.error(err.response?.data?.message || 'Failed to load summary');
+    }
+  };
+
   const handleDelete = async (id: number) => {
     setDeleteId(id);
     setShowDeleteModal(true);
@@ -200,6 +211,17 @@ const Dashboard = () => {
                 onUpdated={fetchData}
               />
 
+              {nextCursor && (
+                <div className="flex justify-center mt-4">
+                  <button
+                    onClick={() => fetchTransactions(nextCursor)}
+                    className="bg-gray-200 hover:bg-gray-300 text-teal-800 px-4 py-2 rounded-lg text-sm"
+                  >
+                    Load more
+                  </button>
+                </div>
+              )}
+
               <TransactionModal isOpen={isModalOpen} onClose={() => setIsModalOpen(false)}>
                 <TransactionForm
                   onAdd={handleTransactionAdded}
@@ -235,7 +257,7 @@ const Dashboard = () => {
                   <FaRobot /> Get Budget Advice
                 </motion.button>
               </div>
-              <Chart data={transactions} />
+              <Chart refreshKey={chartVersion} />
             </motion.div>
           )}
 